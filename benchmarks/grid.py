@@ -0,0 +1,63 @@
+import random
+
+from q_learning import Action, State
+
+
+def generate_grid(
+    size: int,
+    seed: int = 0,
+    cat_density: float = 0.1,
+) -> tuple[
+    State,
+    list[tuple[State, list[Action]]],
+    list[tuple[State, list[tuple[Action, float]]]],
+]:
+    """Return the starting State, States and Actions, and States, Actions and
+    rewards for a size x size Mouse and Cheese grid.
+
+    Cats are placed at random (reproducibly from seed) on roughly
+    cat_density of the cells, with the Mouse starting in the top left corner
+    and the Cheese in the bottom right.
+    """
+
+    rng = random.Random(seed)
+    start = (0, 0)
+    cheese = (size - 1, size - 1)
+    cats = {
+        (x, y) for x in range(size) for y in range(size)
+        if rng.random() < cat_density
+    } - {start, cheese}
+
+    actions = [
+        Action(lambda x: (x[0], x[1] - 1)),     # Up
+        Action(lambda x: (x[0] + 1, x[1])),     # Right
+        Action(lambda x: (x[0], x[1] + 1)),     # Down
+        Action(lambda x: (x[0] - 1, x[1])),     # Left
+    ]
+
+    states_and_actions = []
+    states_actions_rewards = []
+    for x in range(size):
+        for y in range(size):
+            state = State((x, y))
+            if (x, y) in cats or (x, y) == cheese:
+                states_and_actions.append((state, []))
+                states_actions_rewards.append((state, []))
+                continue
+            available = []
+            rewards = []
+            for action in actions:
+                next_x, next_y = action._effect_on_state((x, y))
+                if not (0 <= next_x < size and 0 <= next_y < size):
+                    continue
+                available.append(action)
+                if (next_x, next_y) in cats:
+                    rewards.append((action, -10))
+                elif (next_x, next_y) == cheese:
+                    rewards.append((action, 100))
+                else:
+                    rewards.append((action, 0))
+            states_and_actions.append((state, available))
+            states_actions_rewards.append((state, rewards))
+
+    return State(start), states_and_actions, states_actions_rewards
@@ -0,0 +1,240 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.grid import generate_grid
+from q_learning import Agent, DenseQTable, QTable, RewardTable
+
+BACKENDS = {
+    'QTable': QTable,
+    'DenseQTable': DenseQTable,
+}
+
+
+def best_time(func: Callable[[], None], repeats: int) -> float:
+    """Return the shortest time in seconds taken by func over the repeats."""
+
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def retained_memory(func: Callable[[], object]) -> int:
+    """Return the memory in bytes still held by what func returns, after
+    any temporary allocations made while running it have been freed."""
+
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def benchmark_grid(
+    size: int,
+    seed: int,
+    steps: int,
+    calls: int,
+    repeats: int,
+) -> dict[str, dict[str, float]]:
+    """Return the results of every benchmark on a size x size grid."""
+
+    start, states_and_actions, states_actions_rewards = \
+        generate_grid(size, seed)
+    n_states = len(states_and_actions)
+
+    # Sample State-Action pairs to look up
+    rng = random.Random(seed)
+    pairs = [
+        (state, action) for state, actions in rng.choices(
+            [row for row in states_and_actions if row[1]], k=calls,
+        )
+        for action in rng.sample(actions, 1)
+    ]
+    states = [state for state, _ in pairs]
+
+    results = {}
+
+    # RewardTable
+    reward_table = RewardTable(states_actions_rewards)
+
+    def get_rewards() -> None:
+        for pair in pairs:
+            reward_table[pair]
+
+    results['RewardTable'] = {
+        'construction_seconds': best_time(
+            lambda: RewardTable(states_actions_rewards), repeats,
+        ),
+        'bytes_per_state': retained_memory(
+            lambda: RewardTable(states_actions_rewards),
+        ) / n_states,
+        'getitem_seconds': best_time(get_rewards, repeats) / calls,
+    }
+
+    # QTables
+    for name, backend in BACKENDS.items():
+        q_table = backend(states_and_actions)
+        best_action = q_table.best_action
+
+        def get_best_actions() -> None:
+            for state in states:
+                best_action(state)
+
+        def get_q_values() -> None:
+            for pair in pairs:
+                q_table[pair]
+
+        def set_q_values() -> None:
+            for pair in pairs:
+                q_table[pair] = 0.5
+
+        def take_steps() -> None:
+            agent = Agent(
+                start, reward_table, backend(states_and_actions), 1, 0.5,
+            )
+            for _ in range(steps):
+                agent.next_state()
+
+        def run_steps() -> None:
+            agent = Agent(
+                start, reward_table, backend(states_and_actions), 1, 0.5,
+            )
+            agent.run_steps(steps)
+
+        results[name] = {
+            'construction_seconds': best_time(
+                lambda: backend(states_and_actions), repeats,
+            ),
+            'bytes_per_state': retained_memory(
+                lambda: backend(states_and_actions),
+            ) / n_states,
+            'best_action_seconds': best_time(get_best_actions, repeats) / calls,
+            'getitem_seconds': best_time(get_q_values, repeats) / calls,
+            'setitem_seconds': best_time(set_q_values, repeats) / calls,
+            'next_state_per_second': steps / best_time(take_steps, 1),
+            'run_steps_per_second': steps / best_time(run_steps, 1),
+        }
+
+    return results
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    tolerance: float,
+) -> list[str]:
+    """Print how each result compares with the baseline (to stderr, so it
+    doesn't mix with JSON results written to stdout) and return the names of
+    those that have regressed by more than tolerance.
+
+    Results ending in _per_second are better when higher, all others are
+    better when lower.
+    """
+
+    regressions = []
+    for grid, tables in results['results'].items():
+        for table, metrics in tables.items():
+            for metric, value in metrics.items():
+                try:
+                    old = baseline['results'][grid][table][metric]
+                except KeyError:
+                    continue
+                name = f"{grid}/{table}/{metric}"
+                if metric.endswith('_per_second'):
+                    change = (old - value) / old if old else 0
+                else:
+                    change = (value - old) / old if old else 0
+                flag = ''
+                if change > tolerance:
+                    flag = 'REGRESSION'
+                    regressions.append(name)
+                print(
+                    f"{name:<50} {old:>12.4g} -> {value:>12.4g} "
+                    + f"({-change:+.1%}) {flag}",
+                    file=sys.stderr,
+                )
+
+    return regressions
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the q_learning hot paths.",
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10, 100, 1000],
+        help="side lengths of the square grids to benchmark",
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--steps', type=int, default=100_000,
+        help="number of Agent steps to time",
+    )
+    parser.add_argument(
+        '--calls', type=int, default=10_000,
+        help="number of look ups to time",
+    )
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument(
+        '--output', default=None,
+        help="file to write the JSON results to (default stdout)",
+    )
+    parser.add_argument(
+        '--baseline', default=None,
+        help="JSON results to compare against",
+    )
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help="fractional slowdown allowed before reporting a regression",
+    )
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.time(),
+            'seed': args.seed,
+            'steps': args.steps,
+            'calls': args.calls,
+            'repeats': args.repeats,
+        },
+        'results': {
+            f"{size}x{size}": benchmark_grid(
+                size, args.seed, args.steps, args.calls, args.repeats,
+            )
+            for size in args.sizes
+        },
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+    else:
+        json.dump(results, sys.stdout, indent=4)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
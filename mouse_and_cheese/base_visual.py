@@ -1,10 +1,15 @@
-from functools import cached_property, lru_cache
+from functools import cached_property
 
 import pygame as pg
 
 
 class BaseVisual:
-    """Class that draws all elements of the designing and training."""
+    """Class that draws all elements of the designing and training.
+
+    The grid, Cats and Cheese are drawn once to a background surface, and
+    each frame only the tiles drawn over in the previous frame are restored
+    from it and updated on the display.
+    """
 
     PADDING = 2     # Width of grid lines - should be even
 
@@ -28,6 +33,11 @@ class BaseVisual:
         self.screen = pg.display.set_mode(screen_size)
         self.clock = pg.time.Clock()
 
+        # Track what has been drawn over the background
+        self.background: pg.Surface | None = None
+        self.dirty_rects: list[pg.Rect] = []
+        self._cleared_rects: list[pg.Rect] = []
+
     def gridline_position_to_pixels(self, position: tuple[int, int]) -> None:
         """Convert a gridline position to its pixel position.
         """
@@ -38,11 +48,11 @@ class BaseVisual:
         )
     
     def draw_grid(self) -> None:
-        """Draw the grid lines."""
+        """Draw the grid lines to the background."""
 
         for i in range(0, self.grid_size[0] + 1):
             pg.draw.line(
-                self.screen,
+                self.background,
                 'grey',
                 self.gridline_position_to_pixels((i, 0)),
                 self.gridline_position_to_pixels((i, self.grid_size[1] + 1)),
@@ -51,14 +61,13 @@ class BaseVisual:
 
         for j in range(0, self.grid_size[1] + 1):
             pg.draw.line(
-                self.screen,
+                self.background,
                 'grey',
                 self.gridline_position_to_pixels((0, j)),
                 self.gridline_position_to_pixels((self.grid_size[0] + 1, j)),
                 width = self.PADDING,
             )
 
-    @lru_cache
     def grid_position_to_pixels(self, position: tuple[int, int]) -> None:
         """Convert a grid position to its pixel position."""
 
@@ -75,16 +84,16 @@ class BaseVisual:
         return pg.transform.scale(cat_img, (self.tile_size, self.tile_size))
     
     def draw_cats(self) -> None:
-        """Draw a Cat at all grid positions in self.cats."""
-
-        cat_rects = [
-            pg.Rect(
-                (self.grid_position_to_pixels(cat)),
-                (self.tile_size, self.tile_size)
-            ) for cat in self.cats
-        ]
-        for cat_rect in cat_rects:
-            self.screen.blit(self.cat_sprite, cat_rect)
+        """Draw a Cat to the background at all grid positions in
+        self.cats."""
+
+        self.background.blits(
+            [
+                (self.cat_sprite, self.grid_position_to_pixels(cat))
+                for cat in self.cats
+            ],
+            doreturn=False,
+        )
             
     @cached_property
     def cheese_sprite(self) -> pg.Surface:
@@ -94,13 +103,11 @@ class BaseVisual:
         return pg.transform.scale(cheese_img, (self.tile_size, self.tile_size))
     
     def draw_cheese(self) -> None:
-        """Draw the Cheese on the grid."""
+        """Draw the Cheese to the background."""
 
-        cheese_rect = pg.Rect(
-            (self.grid_position_to_pixels(self.cheese)),
-            (self.tile_size, self.tile_size),
+        self.background.blit(
+            self.cheese_sprite, self.grid_position_to_pixels(self.cheese),
         )
-        self.screen.blit(self.cheese_sprite, cheese_rect)
 
     @cached_property
     def mouse_sprite(self) -> pg.Surface:
@@ -112,8 +119,45 @@ class BaseVisual:
     def draw_mouse(self, mouse_position: tuple[int, int]) -> None:
         """Draw the Mouse on the grid."""
 
-        mouse_rect = pg.Rect(
-            (self.grid_position_to_pixels(mouse_position)),
-            (self.tile_size, self.tile_size),
+        self.dirty_rects.append(
+            self.screen.blit(
+                self.mouse_sprite, self.grid_position_to_pixels(mouse_position),
+            )
         )
-        self.screen.blit(self.mouse_sprite, mouse_rect)
+
+    def render_background(self) -> None:
+        """Draw the grid, Cats and Cheese to the background and show it.
+
+        Should be called whenever the Cats or Cheese change.
+        """
+
+        self.background = pg.Surface(self.screen.get_size())
+        self.background.fill('white')
+        self.draw_grid()
+        self.draw_cats()
+        self.draw_cheese()
+        self.show_background()
+
+    def show_background(self) -> None:
+        """Draw the whole background to the screen and show it, forgetting
+        anything drawn over it."""
+
+        self.screen.blit(self.background, (0, 0))
+        self.dirty_rects = []
+        self._cleared_rects = []
+        pg.display.flip()
+
+    def clear_frame(self) -> None:
+        """Start a new frame by restoring the background wherever the last
+        frame was drawn over it."""
+
+        for rect in self.dirty_rects:
+            self.screen.blit(self.background, rect, rect)
+        self._cleared_rects = self.dirty_rects
+        self.dirty_rects = []
+
+    def show_frame(self) -> None:
+        """Update the parts of the display that have changed since the last
+        frame."""
+
+        pg.display.update(self._cleared_rects + self.dirty_rects)
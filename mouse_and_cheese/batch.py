@@ -0,0 +1,155 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator
+
+from mouse_and_cheese.headless import HeadlessTrain
+from mouse_and_cheese.layout import load_layout
+from mouse_and_cheese.layout_error import LayoutError
+from mouse_and_cheese.settings import settings
+from q_learning import ConvergenceMonitor, EpsilonGreedyPolicy
+
+RESULT_FIELDS = [
+    'layout',
+    'steps',
+    'episodes',
+    'converged',
+    'final_episode_length',
+    'wall_time',
+    'error',
+]
+
+
+def layout_paths(directory: str) -> Iterator[str]:
+    """Yield the path of every layout file (ending in .json) in directory, in
+    name order."""
+
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            yield os.path.join(directory, name)
+
+
+def train_layout(
+    path: str,
+    output: str,
+    settings: dict,
+    steps: int,
+    patience: int | None = None,
+    tolerance: float = 1e-6,
+) -> dict:
+    """Train a Mouse headless on the layout file at path and return a summary
+    of the run.
+
+    The learned QTable is saved to <output>/<name>.qlck and the Metrics to
+    <output>/<name>.metrics.json, where name is the layout file's name
+    without .json. If the checkpoint already exists then training warm
+    starts from it. Training stops early once no Q-value has changed by more
+    than tolerance for patience episodes in a row, if patience is given.
+    If the layout file is invalid, or anything else goes wrong training on
+    it (e.g. its checkpoint can't be loaded), then the summary holds the
+    error instead, so one bad layout doesn't stop the rest of the batch.
+    """
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    start_time = time.perf_counter()
+    try:
+        grid_size, layout = load_layout(path)
+        trainer = HeadlessTrain(
+            settings | {
+                'grid_size': grid_size,
+                'checkpoint_path': os.path.join(output, f"{name}.qlck"),
+                'checkpoint_every': float('inf'),
+                'metrics_path': os.path.join(output, f"{name}.metrics.json"),
+                'metrics_every': float('inf'),
+            },
+            *layout,
+        )
+        monitor = None
+        if patience is not None:
+            monitor = ConvergenceMonitor(tolerance, patience)
+        result = trainer.run(steps, monitor=monitor)
+    except LayoutError as e:
+        return {'layout': name, 'error': str(e)}
+    except Exception as e:
+        return {'layout': name, 'error': f"{type(e).__name__}: {e}"}
+
+    return {
+        'layout': name,
+        'steps': result.steps,
+        'episodes': result.episodes,
+        'converged': result.converged,
+        'final_episode_length': trainer.mouse.last_episode_length,
+        'wall_time': time.perf_counter() - start_time,
+    }
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(
+        description="Train a headless Mouse on every layout in a directory.",
+    )
+    parser.add_argument(
+        'layouts', help="directory of JSON layout files to train on",
+    )
+    parser.add_argument(
+        '--output', default='trained',
+        help="directory to write the QTables and metrics to",
+    )
+    parser.add_argument(
+        '--steps', type=int, default=1_000_000,
+        help="maximum number of steps per layout",
+    )
+    parser.add_argument(
+        '--patience', type=int, default=None,
+        help="stop once Q-values have settled for this many episodes",
+    )
+    parser.add_argument(
+        '--tolerance', type=float, default=1e-6,
+        help="largest change in a Q-value that counts as settled",
+    )
+    parser.add_argument(
+        '--learning-rate', type=float, default=settings['learning_rate'],
+    )
+    parser.add_argument(
+        '--discount-factor', type=float, default=settings['discount_factor'],
+    )
+    parser.add_argument(
+        '--epsilon', type=float, default=0,
+        help="chance of exploring with a random Action at each step",
+    )
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count(),
+        help="number of processes (default one per core)",
+    )
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    run_settings = settings | {
+        'learning_rate': args.learning_rate,
+        'discount_factor': args.discount_factor,
+        'policy': EpsilonGreedyPolicy(args.epsilon) if args.epsilon else None,
+    }
+
+    # Write each summary as soon as its layout is done (in layout order)
+    writer = csv.DictWriter(sys.stdout, RESULT_FIELDS)
+    writer.writeheader()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for summary in executor.map(
+            train_layout,
+            layout_paths(args.layouts),
+            repeat(args.output),
+            repeat(run_settings),
+            repeat(args.steps),
+            repeat(args.patience),
+            repeat(args.tolerance),
+        ):
+            writer.writerow(summary)
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,15 @@ import pygame as pg
 
 from mouse_and_cheese.base_visual import BaseVisual
 from mouse_and_cheese.entity import Entity, EntityCollection
+from mouse_and_cheese.layout import save_layout
 
 
 class Design(BaseVisual):
-    """Class for placing the Mouse, Cats and Cheese."""
+    """Class for placing the Mouse, Cats and Cheese.
+
+    Pressing S exports the current design to the layout file at
+    settings['layout_path'], if set, for training headless later.
+    """
 
     def __init__(self, settings: dict) -> None:
 
@@ -20,6 +25,8 @@ class Design(BaseVisual):
 
         # Track current mode
         self.current_entity = Entity.CAT
+        self.layout_path: str | None = settings.get('layout_path')
+        self.render_background()
 
     def check_events(self) -> bool:
         """Check for Mouse, Cats and Cheese placement.
@@ -50,6 +57,7 @@ class Design(BaseVisual):
                             self.start = cell
                     case Entity.NONE:
                         self.cats.discard(cell)
+                self.render_background()
 
             elif event.type == pg.KEYDOWN:
 
@@ -63,11 +71,23 @@ class Design(BaseVisual):
                         (self.current_entity.value + 1) % len(Entity)
                     )
 
+                elif event.key == pg.K_s and self.layout_path:
+                    self.export(self.layout_path)
+
                 elif event.key == pg.K_RETURN:
                     return True
 
         return False
 
+    def export(self, path: str) -> None:
+        """Write the current design to a layout file at path."""
+
+        save_layout(
+            path,
+            self.grid_size,
+            EntityCollection(self.start, self.cats, self.cheese),
+        )
+
     def draw_current_entity(self) -> None:
         """Draw the current entity on the mouse position."""
 
@@ -84,18 +104,15 @@ class Design(BaseVisual):
             case Entity.NONE:
                 return
         pg.transform.scale(sprite, (self.tile_size // 2, self.tile_size // 2))
-        self.screen.blit(sprite, entity_rect)
+        self.dirty_rects.append(self.screen.blit(sprite, entity_rect))
 
     def update_screen(self) -> None:
         """Draw the current frame to the screen."""
 
-        self.screen.fill('white')
-        super().draw_grid()
-        super().draw_cats()
-        super().draw_cheese()
-        super().draw_mouse(self.start)
+        self.clear_frame()
+        self.draw_mouse(self.start)
         self.draw_current_entity()
-        pg.display.flip()
+        self.show_frame()
 
     def run(self) -> EntityCollection:
         """Run the main loop."""
@@ -0,0 +1,323 @@
+import os
+
+import numpy as np
+
+from q_learning import (
+    Action,
+    Agent,
+    DenseQTable,
+    DenseRewardTable,
+    DenseTransitionTable,
+    LazyQTable,
+    LazyRewardTable,
+    Metrics,
+    ReplayBuffer,
+    State,
+    value_iteration,
+)
+from q_learning.checkpoint import load_q_table, save_q_table
+from q_learning.state import StateIndex
+
+
+class Environment:
+    """Grid containing the Mouse, Cats and Cheese, with the Mouse learning to
+    get to the Cheese using simple Q-learning.
+
+    Contains no visuals so it can be used without pygame.
+    """
+
+    # Movements to adjacent grid positions
+    MOVES = [
+        (0, -1),    # Up
+        (1, 0),     # Right
+        (0, 1),     # Down
+        (-1, 0),    # Left
+    ]
+
+    def __init__(
+        self,
+        settings: dict,
+        start: tuple[int, int],
+        cats: set[tuple[int, int]],
+        cheese: tuple[int,int],
+    ) -> None:
+
+        # Store the set up
+        self.settings = settings
+        self.grid_size = settings['grid_size']
+        self.start = start
+        self.cats = cats
+        self.cheese = cheese
+
+        # Unpack the settings
+        learning_rate = settings['learning_rate']
+        discount_factor = settings['discount_factor']
+        self.checkpoint_path: str | None = settings.get('checkpoint_path')
+        self.checkpoint_every: int = settings.get('checkpoint_every', 100_000)
+        self.metrics_path: str | None = settings.get('metrics_path')
+        self.metrics_every: int = settings.get('metrics_every', 100_000)
+
+        # Create the tables, either for every State up front or only as the
+        # Mouse reaches each State
+        self._moves = list(zip(self.actions, self.MOVES))
+        self.lazy: bool = settings.get('lazy', False)
+        if self.lazy:
+            q_table, reward_table = self._lazy_tables()
+        else:
+            q_table, reward_table = self._dense_tables()
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            load_q_table(self.checkpoint_path, q_table)
+
+        # Create the Agent
+        replay_capacity = settings.get('replay_capacity', 0)
+        self.metrics: Metrics | None = None
+        if self.metrics_path:
+            self.metrics = Metrics(settings.get('metrics_timing', False))
+        self.mouse = Agent(
+            State((start)),
+            reward_table,
+            q_table,
+            learning_rate,
+            discount_factor,
+            self.transition_table,
+            settings.get('policy'),
+            ReplayBuffer(replay_capacity) if replay_capacity else None,
+            settings.get('replay_batch_size', 32),
+            self.metrics,
+            settings.get('trace_decay', 0),
+            settings.get('n_steps', 1),
+        )
+
+    def _dense_tables(self) -> tuple[DenseQTable, DenseRewardTable]:
+        """Create the QTable and RewardTable with a row for every State, and
+        self.transition_table."""
+
+        # Index the States, with State (x, y) in row x * height + y
+        # The index is computed, so no State is created until it is needed
+        width, height = self.grid_size
+        state_index = StateIndex(width * height, self._position, self._row)
+        states = state_index.labels
+        actions = [action for action, _ in self._moves]
+        x, y = np.divmod(np.arange(len(states)), height)
+
+        # Create the TransitionTable
+        # Only Actions that take a State to another valid State are kept
+        next_x = x[:, np.newaxis] + [dx for dx, _ in self.MOVES]
+        next_y = y[:, np.newaxis] + [dy for _, dy in self.MOVES]
+        valid = (0 <= next_x) & (next_x < width) & \
+            (0 <= next_y) & (next_y < height)
+        next_states = np.where(valid, next_x * height + next_y, 0)
+        self.transition_table = DenseTransitionTable.from_arrays(
+            states, actions, next_states, valid, state_index,
+        )
+
+        # Create the QTable
+        # States where the episode is over have no Actions
+        is_cat = np.zeros(len(states), dtype=bool)
+        for cat in self.cats:
+            is_cat[self._row(cat)] = True
+        is_cheese = np.zeros(len(states), dtype=bool)
+        is_cheese[self._row(self.cheese)] = True
+        available = valid & ~(is_cat | is_cheese)[:, np.newaxis]
+        q_table = DenseQTable.from_arrays(
+            states, actions, available, state_index=state_index,
+        )
+
+        # Create the RewardTable
+        # -10 for hitting a Cat, 100 for eating the Cheese
+        rewards = np.select(
+            [is_cat[next_states], is_cheese[next_states]], [-10, 100], 0,
+        ).astype(float)
+        reward_table = DenseRewardTable.from_arrays(
+            states, actions, rewards, available, state_index,
+        )
+
+        return q_table, reward_table
+
+    def _row(self, position: tuple[int, int]) -> int | None:
+        """Return the row of the State at position, or None if it is off the
+        grid."""
+
+        if not self._on_grid(position):
+            return None
+        return position[0] * self.grid_size[1] + position[1]
+
+    def _position(self, row: int) -> tuple[int, int]:
+        """Return the position of the State in row."""
+        return divmod(row, self.grid_size[1])
+
+    def _lazy_tables(self) -> tuple[LazyQTable, LazyRewardTable]:
+        """Create the QTable and RewardTable with rows only made as States are
+        reached, and no TransitionTable."""
+
+        self.transition_table = None
+        return (
+            LazyQTable(self._available_actions),
+            LazyRewardTable(self._reward),
+        )
+
+    def _available_actions(self, state: State) -> list[Action]:
+        """Return the Actions that take state to another valid State, or none
+        if the episode is over at state."""
+
+        position = state._identifier
+        if position in self.cats or position == self.cheese:
+            return []
+
+        (x, y), (width, height) = position, self.grid_size
+        return [
+            action for action, (dx, dy) in self._moves
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        ]
+
+    def _reward(self, state: State, action: Action) -> float:
+        """Return the reward for taking action from state."""
+
+        position = action.act_on(state)._identifier
+        if position in self.cats:
+            return -10
+        if position == self.cheese:
+            return 100
+        return 0
+
+    def add_cat(self, cat: tuple[int, int]) -> None:
+        """Put a Cat on the grid position cat, keeping everything learned.
+
+        Only the tables' entries at cat and for moving onto it are changed.
+        If cat is the start, the Cheese or off the grid then raises a
+        ValueError.
+        """
+
+        if cat in (self.start, self.cheese) or not self._on_grid(cat):
+            raise ValueError(f"A Cat can't be put at {cat}.")
+
+        self.cats.add(cat)
+        self._update_position(cat)
+
+    def remove_cat(self, cat: tuple[int, int]) -> None:
+        """Take the Cat off the grid position cat, keeping everything
+        learned.
+
+        Only the tables' entries at cat and for moving onto it are changed.
+        If there is no Cat at cat then raises a ValueError.
+        """
+
+        if cat not in self.cats:
+            raise ValueError(f"There is no Cat at {cat}.")
+
+        self.cats.remove(cat)
+        self._update_position(cat)
+
+    def move_cheese(self, cheese: tuple[int, int]) -> None:
+        """Move the Cheese to the grid position cheese, keeping everything
+        learned.
+
+        Only the tables' entries at the old and new positions and for moving
+        onto them are changed.
+        If cheese is the start, a Cat or off the grid then raises a
+        ValueError.
+        """
+
+        if cheese == self.start or cheese in self.cats or \
+            not self._on_grid(cheese):
+            raise ValueError(f"The Cheese can't be moved to {cheese}.")
+
+        old_cheese, self.cheese = self.cheese, cheese
+        self._update_position(old_cheese)
+        self._update_position(cheese)
+
+    def _on_grid(self, position: tuple[int, int]) -> bool:
+        """Return True if position is within the grid."""
+
+        x, y = position
+        return 0 <= x < self.grid_size[0] and 0 <= y < self.grid_size[1]
+
+    def _update_position(self, position: tuple[int, int]) -> None:
+        """Bring the tables up to date after what is at position changed.
+
+        The Actions and rewards at position are set again, along with the
+        reward for moving onto it from each neighbouring position. If the
+        Mouse is at position then it is reset, as the reward it got for
+        moving there is out of date.
+        """
+
+        q_table = self.mouse.q_table
+        reward_table = self.mouse.reward_table
+
+        state = State(position)
+        actions = self._available_actions(state)
+        q_table.set_actions(state, actions)
+        reward_table.set_rewards(
+            state,
+            [(action, self._reward(state, action)) for action in actions],
+        )
+
+        changed = [state]
+        x, y = position
+        for action, (dx, dy) in self._moves:
+            neighbour = (x - dx, y - dy)
+            if not self._on_grid(neighbour) or neighbour in self.cats or \
+                neighbour == self.cheese:
+                continue
+            neighbour = State(neighbour)
+            reward_table[neighbour, action] = self._reward(neighbour, action)
+            changed.append(neighbour)
+
+        self.mouse.refresh_model(changed)
+        if self.mouse.current_state is state:
+            self.mouse.reset()
+
+    def solve(self) -> int:
+        """Set the Mouse's Q-values to their optimal values by value
+        iteration, without training, and return the number of sweeps
+        made.
+
+        If self.lazy then every State is visited first, as the whole
+        environment is needed.
+        """
+
+        if self.lazy:
+            for state in self.states:
+                self.mouse.q_table.visit(state)
+
+        return value_iteration(
+            self.mouse.q_table,
+            self.mouse.reward_table,
+            self.mouse.discount_rate,
+            self.transition_table,
+        )
+
+    def save_checkpoint(self) -> None:
+        """Save the Mouse's QTable to self.checkpoint_path, if set."""
+
+        if self.checkpoint_path:
+            save_q_table(self.mouse.q_table, self.checkpoint_path)
+
+    def save_metrics(self) -> None:
+        """Export the Mouse's Metrics to self.metrics_path, if set."""
+
+        if self.metrics_path:
+            self.metrics.write(self.metrics_path)
+
+    @property
+    def states(self) -> set[State]:
+        """Return a set of all possible States.
+
+        This is comprised of all positions contained in the grid with size
+        self.grid_size.
+        """
+
+        return {State((x, y)) for x in range(0, self.grid_size[0])
+                  for y in range(0, self.grid_size[1])}
+
+    @property
+    def actions(self) -> list[Action]:
+        """Return a list of all possible Actions.
+
+        This is comprised of movements to adjacent grid positions.
+        """
+
+        return [
+            Action(lambda x, dx=dx, dy=dy: (x[0] + dx, x[1] + dy))
+            for dx, dy in self.MOVES
+        ]
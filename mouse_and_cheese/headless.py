@@ -0,0 +1,420 @@
+import argparse
+import cProfile
+import pstats
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from mouse_and_cheese.environment import Environment
+from mouse_and_cheese.settings import settings
+from q_learning import (
+    BatchAgent,
+    BoltzmannPolicy,
+    ConvergenceMonitor,
+    EpsilonGreedyPolicy,
+    Metrics,
+    greedy_path,
+)
+from q_learning.shared_q_table import SharedQTable
+
+TrainingResult = namedtuple(
+    'TrainingResult',
+    ['steps', 'episodes', 'seconds', 'steps_per_second', 'q_table',
+     'converged'],
+    defaults=[False],
+)
+
+
+class HeadlessTrain(Environment):
+    """Class that trains a Mouse to get to the Cheese as fast as possible, with
+    no visuals.
+
+    Never imports pygame so can be used on machines without a display.
+    """
+
+    def run(
+        self,
+        steps: int | None = None,
+        episodes: int | None = None,
+        monitor: ConvergenceMonitor | None = None,
+    ) -> TrainingResult:
+        """Run the main loop until the given number of steps have been taken
+        or episodes have been completed (whichever comes first), or until
+        monitor says learning has converged.
+
+        At least one of steps, episodes and monitor must be given.
+        The QTable is checkpointed every self.checkpoint_every steps and at the
+        end if self.checkpoint_path is set, and likewise the Metrics are
+        exported every self.metrics_every steps if self.metrics_path is set.
+        """
+
+        if steps is None and episodes is None and monitor is None:
+            raise ValueError(
+                "At least one of steps, episodes and monitor must be set."
+            )
+
+        max_steps = steps if steps is not None else float('inf')
+        max_episodes = episodes if episodes is not None else float('inf')
+        run_episode = self.mouse.run_episode
+        converged = False
+
+        steps_taken = 0
+        episodes_completed = 0
+        next_checkpoint = self.checkpoint_every if self.checkpoint_path \
+            else float('inf')
+        next_export = self.metrics_every if self.metrics_path \
+            else float('inf')
+        start_time = time.perf_counter()
+        while steps_taken < max_steps and episodes_completed < max_episodes:
+            # Learn up to the end of the episode or the next checkpoint or
+            # export, whichever comes first
+            summary = run_episode(
+                min(max_steps, next_checkpoint, next_export) - steps_taken,
+            )
+            steps_taken += summary.steps
+            if summary.terminal:
+                episodes_completed += 1
+                if monitor and monitor.episode_end(self.mouse):
+                    converged = True
+                    break
+            if steps_taken >= next_checkpoint:
+                self.save_checkpoint()
+                next_checkpoint += self.checkpoint_every
+            if steps_taken >= next_export:
+                self.save_metrics()
+                next_export += self.metrics_every
+        seconds = time.perf_counter() - start_time
+        self.save_checkpoint()
+        if steps_taken != next_export - self.metrics_every:
+            self.save_metrics()
+
+        return TrainingResult(
+            steps_taken,
+            episodes_completed,
+            seconds,
+            steps_taken / seconds if seconds else float('inf'),
+            self.mouse.q_table,
+            converged,
+        )
+
+    def run_batch(
+        self,
+        batch_size: int,
+        steps: int | None = None,
+        episodes: int | None = None,
+    ) -> TrainingResult:
+        """Run the main loop with batch_size Mice learning at the same time
+        into a shared QTable, until the given total number of steps have been
+        taken or episodes have been completed (whichever comes first).
+
+        At least one of steps and episodes must be given.
+        The QTable is checkpointed every self.checkpoint_every steps and at the
+        end if self.checkpoint_path is set. Metrics aren't recorded for a
+        batch of Mice, so if self.metrics_path is set then raises a
+        ValueError.
+        """
+
+        if steps is None and episodes is None:
+            raise ValueError("At least one of steps and episodes must be set.")
+        if self.metrics_path:
+            raise ValueError("Metrics can't be recorded for a batch of Mice.")
+
+        max_steps = steps if steps is not None else float('inf')
+        max_episodes = episodes if episodes is not None else float('inf')
+        mice = BatchAgent(
+            self.mouse.starting_state,
+            self.mouse.reward_table,
+            self.mouse.q_table,
+            self.mouse.learning_rate,
+            self.mouse.discount_rate,
+            batch_size,
+            transition_table=self.transition_table,
+        )
+        next_state = mice.next_state
+
+        steps_taken = 0
+        episodes_completed = 0
+        next_checkpoint = self.checkpoint_every if self.checkpoint_path \
+            else float('inf')
+        start_time = time.perf_counter()
+        while steps_taken < max_steps and episodes_completed < max_episodes:
+            episodes_completed += int(next_state().sum())
+            steps_taken += batch_size
+            if steps_taken >= next_checkpoint:
+                self.save_checkpoint()
+                next_checkpoint += self.checkpoint_every
+        seconds = time.perf_counter() - start_time
+        self.save_checkpoint()
+
+        return TrainingResult(
+            steps_taken,
+            episodes_completed,
+            seconds,
+            steps_taken / seconds if seconds else float('inf'),
+            self.mouse.q_table,
+        )
+
+    def run_parallel(
+        self,
+        workers: int,
+        steps: int,
+    ) -> TrainingResult:
+        """Run the main loop in workers processes at once, each taking the
+        given number of steps with its own Mouse, all learning into one QTable
+        in shared memory without locks.
+
+        Each worker reseeds its copy of the Policy with the Policy's seed plus
+        the worker's index (or with fresh entropy if the Policy has no seed),
+        so the workers explore differently. The learned values are copied
+        back into self.mouse.q_table, and if there are Metrics then each
+        worker records its own and they are merged into self.metrics, which
+        is then exported.
+        If there is more than one worker and the Policy doesn't explore at
+        random then raises a ValueError, as every worker would collect the
+        same experience.
+        """
+
+        policy = self.mouse.policy
+        if workers > 1 and not (
+            isinstance(policy, BoltzmannPolicy)
+            or isinstance(policy, EpsilonGreedyPolicy) and policy.epsilon > 0
+        ):
+            raise ValueError(
+                "Training with more than one worker needs an "
+                + "EpsilonGreedyPolicy or BoltzmannPolicy to explore with."
+            )
+        seed = None if policy is None else policy.seed
+        seeds = [
+            None if seed is None else seed + worker
+            for worker in range(workers)
+        ]
+
+        shared_q_table = SharedQTable.from_q_table(self.mouse.q_table)
+        settings = self.settings | {
+            'checkpoint_path': None,
+            'metrics_path': None,
+        }
+        layout = (self.start, self.cats, self.cheese)
+        metrics = [
+            Metrics(self.metrics.timing) if self.metrics is not None else None
+            for _ in range(workers)
+        ]
+
+        try:
+            start_time = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results, metrics = zip(*executor.map(
+                    _run_worker,
+                    [settings] * workers,
+                    [layout] * workers,
+                    [shared_q_table.name] * workers,
+                    [steps] * workers,
+                    seeds,
+                    metrics,
+                ))
+            seconds = time.perf_counter() - start_time
+            self.mouse.q_table.values[:] = shared_q_table.values
+        finally:
+            shared_q_table.close()
+            shared_q_table.unlink()
+        self.save_checkpoint()
+        if self.metrics is not None:
+            for worker_metrics in metrics:
+                self.metrics.merge(worker_metrics)
+            self.save_metrics()
+
+        steps_taken = sum(result.steps for result in results)
+        return TrainingResult(
+            steps_taken,
+            sum(result.episodes for result in results),
+            seconds,
+            steps_taken / seconds if seconds else float('inf'),
+            self.mouse.q_table,
+        )
+
+
+def _run_worker(
+    settings: dict,
+    layout: tuple[tuple[int, int], set[tuple[int, int]], tuple[int, int]],
+    name: str,
+    steps: int,
+    seed: int | None,
+    metrics: Metrics | None,
+) -> tuple[TrainingResult, Metrics | None]:
+    """Train a Mouse for the given number of steps into the shared QTable with
+    the given name, with its Policy reseeded with seed and recording into
+    metrics, returning the result without the QTable and the Metrics."""
+
+    trainer = HeadlessTrain(settings, *layout)
+    trainer.metrics = trainer.mouse.metrics = metrics
+    if trainer.mouse.policy is not None:
+        trainer.mouse.policy.reseed(seed)
+    shared_q_table = SharedQTable.attach(name, trainer.mouse.q_table)
+    trainer.mouse.q_table = shared_q_table
+    try:
+        return trainer.run(steps)._replace(q_table=None), metrics
+    finally:
+        trainer.mouse.q_table = None
+        shared_q_table.close()
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(
+        description="Train the Mouse without a display.",
+    )
+    parser.add_argument('--steps', type=int, default=None)
+    parser.add_argument('--episodes', type=int, default=None)
+    parser.add_argument(
+        '--patience', type=int, default=None,
+        help="stop once Q-values have settled for this many episodes",
+    )
+    parser.add_argument(
+        '--tolerance', type=float, default=1e-6,
+        help="largest change in a Q-value that counts as settled",
+    )
+    parser.add_argument(
+        '--epsilon', type=float, default=0,
+        help="chance of exploring with a random Action at each step",
+    )
+    parser.add_argument(
+        '--epsilon-decay', type=float, default=1,
+        help="factor epsilon is multiplied by after each episode",
+    )
+    parser.add_argument(
+        '--replay-capacity', type=int, default=settings['replay_capacity'],
+        help="number of past transitions kept to learn from again",
+    )
+    parser.add_argument(
+        '--replay-batch-size', type=int, default=settings['replay_batch_size'],
+    )
+    parser.add_argument(
+        '--trace-decay', type=float, default=settings['trace_decay'],
+        help="lambda for Watkins's Q(lambda) eligibility traces",
+    )
+    parser.add_argument(
+        '--n-steps', type=int, default=settings['n_steps'],
+        help="number of rewards summed in each update's return",
+    )
+    parser.add_argument(
+        '--lazy', action='store_true',
+        help="only create the QTable rows for States the Mouse reaches",
+    )
+    parser.add_argument(
+        '--solve', action='store_true',
+        help="find the optimal QTable by value iteration instead of training",
+    )
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="number of processes learning into one shared QTable",
+    )
+    parser.add_argument(
+        '--checkpoint', default=settings['checkpoint_path'],
+        help="file to save the QTable to, and warm start from if it exists",
+    )
+    parser.add_argument(
+        '--checkpoint-every', type=int, default=settings['checkpoint_every'],
+    )
+    parser.add_argument(
+        '--metrics', default=settings['metrics_path'],
+        help="JSON or CSV file to export training metrics to",
+    )
+    parser.add_argument(
+        '--metrics-every', type=int, default=settings['metrics_every'],
+    )
+    parser.add_argument(
+        '--timing', action='store_true',
+        help="record the time spent in each phase of a step in the metrics",
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help="profile training with cProfile and print the slowest functions",
+    )
+    args = parser.parse_args()
+    if args.workers > 1 and args.steps is None:
+        parser.error("--steps must be given when using --workers.")
+    if args.workers > 1 and not args.epsilon:
+        parser.error("--epsilon must be given when using --workers.")
+    if args.lazy and (args.workers > 1 or args.batch_size > 1):
+        parser.error("--lazy can't be used with --workers or --batch-size.")
+    if args.metrics and args.batch_size > 1:
+        parser.error("--metrics can't be used with --batch-size.")
+    if args.patience is not None and (args.workers > 1 or args.batch_size > 1):
+        parser.error("--patience can't be used with --batch-size or --workers.")
+    if args.epsilon and args.batch_size > 1:
+        parser.error("--epsilon can't be used with --batch-size.")
+    if args.replay_capacity and args.batch_size > 1:
+        parser.error("--replay-capacity can't be used with --batch-size.")
+    if (args.trace_decay or args.n_steps > 1) and args.batch_size > 1:
+        parser.error(
+            "--trace-decay and --n-steps can't be used with --batch-size."
+        )
+    if args.lazy and args.replay_capacity:
+        parser.error("--lazy can't be used with --replay-capacity.")
+    if args.trace_decay and args.n_steps > 1:
+        parser.error("--trace-decay can't be used with --n-steps.")
+    if args.steps is None and args.episodes is None and \
+        args.patience is None:
+        args.steps = 1_000_000
+
+    # Use the same default layout as the Design
+    grid_size = settings['grid_size']
+    trainer = HeadlessTrain(
+        settings | {
+            'checkpoint_path': args.checkpoint,
+            'checkpoint_every': args.checkpoint_every,
+            'policy': EpsilonGreedyPolicy(args.epsilon, args.epsilon_decay)
+            if args.epsilon else None,
+            'replay_capacity': args.replay_capacity,
+            'replay_batch_size': args.replay_batch_size,
+            'trace_decay': args.trace_decay,
+            'n_steps': args.n_steps,
+            'lazy': args.lazy,
+            'metrics_path': args.metrics,
+            'metrics_every': args.metrics_every,
+            'metrics_timing': args.timing,
+        },
+        (0, 0),
+        set(),
+        (grid_size[0] - 1, grid_size[1] - 1),
+    )
+    if args.solve:
+        start_time = time.perf_counter()
+        sweeps = trainer.solve()
+        seconds = time.perf_counter() - start_time
+        trainer.save_checkpoint()
+        print(
+            f"Solved in {sweeps} sweeps in {seconds:.3f}s. The greedy path "
+            + f"takes {len(greedy_path(trainer.mouse)) - 1} steps."
+        )
+        return
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    if args.workers > 1:
+        result = trainer.run_parallel(args.workers, args.steps)
+    elif args.batch_size > 1:
+        result = trainer.run_batch(args.batch_size, args.steps, args.episodes)
+    else:
+        monitor = None
+        if args.patience is not None:
+            monitor = ConvergenceMonitor(args.tolerance, args.patience)
+        result = trainer.run(args.steps, args.episodes, monitor)
+
+    if args.profile:
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats('tottime').print_stats(15)
+
+    print(
+        f"Took {result.steps} steps and completed {result.episodes} episodes "
+        + f"in {result.seconds:.2f}s ({result.steps_per_second:,.0f} "
+        + "steps/sec)."
+        + (" Learning converged." if result.converged else "")
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import numpy as np
+import pygame as pg
+
+from mouse_and_cheese.base_visual import BaseVisual
+from q_learning import DenseQTable
+
+
+class Heatmap:
+    """Overlay that shades every grid cell by the highest Q-value at it, from
+    blue (lowest) to red (highest), with optional arrows showing the best
+    Action.
+
+    The overlay is built as arrays, one pixel per cell, written to a surface
+    with pygame.surfarray and scaled up to the grid, so drawing it costs no
+    per-cell draw calls.
+    """
+
+    ALPHA = 150                 # Opacity of the shading
+    QUANTILES = 1024            # Values sampled to rank the cells by
+    ARROW_COLOUR = (20, 20, 20)
+
+    def __init__(
+        self,
+        visual: BaseVisual,
+        q_table: DenseQTable,
+        moves: list[tuple[int, int]],
+    ) -> None:
+
+        self.q_table = q_table
+        self.grid_size = visual.grid_size
+        self.tile_size = visual.tile_size
+        self.padding = visual.PADDING
+        width, height = self.grid_size
+        pitch = self.tile_size + self.padding
+
+        # Surfaces reused every time the overlay is drawn
+        self.cells = pg.Surface(self.grid_size, pg.SRCALPHA)
+        self.shading = pg.Surface((width * pitch, height * pitch), pg.SRCALPHA)
+        self.arrow_layer = pg.Surface(self.shading.get_size(), pg.SRCALPHA)
+        self.arrow_layer.fill((*self.ARROW_COLOUR, 0))
+
+        # Opaque inside the tiles and clear on the grid lines, to multiply
+        # the shading by so the grid lines stay unshaded
+        tile_alpha = np.zeros((width, pitch, height, pitch), dtype=np.uint8)
+        tile_alpha[:, :self.tile_size, :, :self.tile_size] = 255
+        self.tile_mask = pg.Surface(self.shading.get_size(), pg.SRCALPHA)
+        self.tile_mask.fill('white')
+        pg.surfarray.pixels_alpha(self.tile_mask)[:] = \
+            tile_alpha.reshape(width * pitch, height * pitch)
+
+        # Pre-render an arrow for each Action (column of q_table)
+        self.arrows: np.ndarray = np.stack([
+            self._arrow(dx, dy) for dx, dy in moves
+        ])
+
+    def _arrow(self, dx: int, dy: int) -> np.ndarray:
+        """Return a tile-sized mask of an arrow pointing in direction (dx,
+        dy)."""
+
+        tile_size = self.tile_size
+        centre = np.array([tile_size, tile_size]) / 2
+        forward = np.array([dx, dy]) * tile_size
+        across = np.array([-dy, dx]) * tile_size
+        points = [
+            centre + 0.35 * forward,
+            centre - 0.25 * forward + 0.2 * across,
+            centre - 0.25 * forward - 0.2 * across,
+        ]
+
+        surface = pg.Surface((tile_size, tile_size))
+        pg.draw.polygon(surface, 'white', [tuple(point) for point in points])
+        return pg.surfarray.array2d(surface) != 0
+
+    def draw(self, surface: pg.Surface, arrows: bool = False) -> None:
+        """Draw the overlay onto surface (the size of the screen), with an
+        arrow on every cell for its best Action if arrows.
+
+        Cells are coloured by the (approximate) rank of their highest
+        Q-value, so the gradient stays visible when the values span orders of
+        magnitude.
+        Cells with no Actions (the Cats and Cheese) are left unshaded.
+        """
+
+        width, height = self.grid_size
+
+        # Rows of q_table are the cells in x-major order, matching surfarray
+        # Reducing column by column is much faster than along short rows
+        q_values = self.q_table.values.reshape(width, height, -1)
+        best_q = q_values[:, :, 0].copy()
+        best_actions = np.zeros(best_q.shape, dtype=np.intp)
+        for j in range(1, q_values.shape[2]):
+            better = q_values[:, :, j] > best_q
+            best_q[better] = q_values[:, :, j][better]
+            best_actions[better] = j
+        shaded = np.isfinite(best_q)
+        scale = np.zeros(best_q.shape)
+        if shaded.any():
+            values = best_q[shaded]
+            quantiles = np.unique(
+                values[::max(len(values) // self.QUANTILES, 1)],
+            )
+            scale[shaded] = np.searchsorted(quantiles, values) / \
+                max(len(quantiles) - 1, 1)
+            np.minimum(scale, 1, out=scale)
+
+        pg.surfarray.blit_array(
+            self.cells,
+            np.stack(
+                [255 * scale, np.full(scale.shape, 60), 255 * (1 - scale)],
+                axis=2,
+            ).astype(np.uint8),
+        )
+        pg.surfarray.pixels_alpha(self.cells)[:] = \
+            np.where(shaded, self.ALPHA, 0)
+
+        # Scale the cells up so each covers its tile and the grid line after
+        # it, then clear the grid lines
+        pg.transform.scale(self.cells, self.shading.get_size(), self.shading)
+        self.shading.blit(
+            self.tile_mask, (0, 0), special_flags=pg.BLEND_RGBA_MULT,
+        )
+        offset = (self.padding, self.padding)
+        surface.blit(self.shading, offset)
+
+        if arrows:
+            tile_size = self.tile_size
+            stamps = self.arrows[best_actions] & \
+                shaded[:, :, np.newaxis, np.newaxis]
+            arrow_alpha = pg.surfarray.pixels_alpha(self.arrow_layer)
+            arrow_alpha.reshape(
+                width, tile_size + self.padding, height, -1,
+            )[:, :tile_size, :, :tile_size] = \
+                255 * stamps.transpose(0, 2, 1, 3)
+            del arrow_alpha
+            surface.blit(self.arrow_layer, offset)
@@ -0,0 +1,85 @@
+"""JSON layout files, describing a grid for the Mouse to learn in.
+
+A layout file holds a single JSON object, e.g.
+    {
+        "grid_size": [10, 10],
+        "start": [0, 0],
+        "cats": [[3, 4], [5, 2]],
+        "cheese": [9, 9]
+    }
+
+Never imports pygame, so layouts can be read in headless batch jobs.
+"""
+
+import json
+
+from mouse_and_cheese.entity import EntityCollection
+from mouse_and_cheese.layout_error import LayoutError
+
+
+def save_layout(
+    path: str,
+    grid_size: tuple[int, int],
+    layout: EntityCollection,
+) -> None:
+    """Write the grid size and layout to a layout file at path."""
+
+    with open(path, 'w') as f:
+        json.dump(
+            {
+                'grid_size': list(grid_size),
+                'start': list(layout.start),
+                'cats': sorted(list(cat) for cat in layout.cats),
+                'cheese': list(layout.cheese),
+            },
+            f,
+            indent=4,
+        )
+
+
+def load_layout(path: str) -> tuple[tuple[int, int], EntityCollection]:
+    """Return the grid size and layout in the layout file at path.
+
+    If the file can't be read or isn't a valid layout (missing or malformed
+    entries, positions off the grid or entities on top of each other) then
+    raises a LayoutError.
+    """
+
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        grid_size = _position(data['grid_size'])
+        start = _position(data['start'])
+        cats = {_position(cat) for cat in data['cats']}
+        cheese = _position(data['cheese'])
+    except OSError as e:
+        raise LayoutError(f"The layout {path} can't be read: {e}.")
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise LayoutError(f"The layout {path} is malformed: {e}.")
+
+    width, height = grid_size
+    for x, y in cats | {start, cheese}:
+        if not (0 <= x < width and 0 <= y < height):
+            raise LayoutError(
+                f"The position {(x, y)} in the layout {path} is off the "
+                + f"{width}x{height} grid."
+            )
+    if start == cheese or cats & {start, cheese}:
+        raise LayoutError(
+            f"The layout {path} has the Mouse, Cats or Cheese on top of each "
+            + "other."
+        )
+
+    return grid_size, EntityCollection(start, cats, cheese)
+
+
+def _position(value: list[int]) -> tuple[int, int]:
+    """Return the pair of integers in value as a tuple.
+
+    If value isn't a pair of integers then raises a ValueError.
+    """
+
+    x, y = value
+    if not (isinstance(x, int) and isinstance(y, int)):
+        raise ValueError(f"{value} is not a pair of integers")
+    return x, y
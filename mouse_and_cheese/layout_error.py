@@ -0,0 +1,2 @@
+class LayoutError(Exception):
+    """Custom Error for issues with reading and writing layout files."""
@@ -4,9 +4,31 @@ settings = {
 
     # Layout settings
     'grid_size': (10, 10),
+    'layout_path': None,            # File the Design is exported to with S
 
     # Q-learning settings
     'learning_rate': 1,
     'discount_factor': 0.5,
+    'policy': None,                 # Exploration Policy (default greedy)
+    'replay_capacity': 0,           # Transitions kept for replay (0 for none)
+    'replay_batch_size': 32,        # Transitions replayed per step
+    'trace_decay': 0,               # Lambda for Q(lambda) (0 for one-step)
+    'n_steps': 1,                   # Rewards summed per update
+    'lazy': False,                  # Only create States as they are reached
+
+    # Display settings
+    'fps': 60,                      # Frames drawn per second when training
+    'steps_per_frame': 2,           # Learning steps between frames
+    'background_learning': False,   # Learn in a background thread instead
+    'heatmap_every': 30,            # Frames between heatmap redraws
+
+    # Checkpoint settings
+    'checkpoint_path': None,        # File to save to and warm start from
+    'checkpoint_every': 100_000,    # Steps between checkpoints
+
+    # Metrics settings
+    'metrics_path': None,           # JSON or CSV file to export metrics to
+    'metrics_every': 100_000,       # Steps between exports
+    'metrics_timing': False,        # Time each phase of every step
 
 }
@@ -0,0 +1,205 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mouse_and_cheese.entity import EntityCollection
+from mouse_and_cheese.headless import HeadlessTrain
+from mouse_and_cheese.settings import settings
+from q_learning import ConvergenceMonitor, EpsilonGreedyPolicy
+
+RESULT_FIELDS = [
+    'learning_rate',
+    'discount_factor',
+    'seed',
+    'layout',
+    'steps',
+    'episodes',
+    'steps_to_convergence',
+    'final_episode_length',
+    'wall_time',
+]
+
+
+def random_layout(
+    grid_size: tuple[int, int],
+    cat_density: float,
+    seed: int,
+) -> EntityCollection:
+    """Return a layout with the Mouse in the top left, the Cheese in the
+    bottom right and Cats placed at random (reproducibly from seed) on
+    roughly cat_density of the other cells."""
+
+    rng = random.Random(seed)
+    start = (0, 0)
+    cheese = (grid_size[0] - 1, grid_size[1] - 1)
+    cats = {
+        (x, y) for x in range(grid_size[0]) for y in range(grid_size[1])
+        if rng.random() < cat_density
+    } - {start, cheese}
+    return EntityCollection(start, cats, cheese)
+
+
+def train(
+    learning_rate: float,
+    discount_factor: float,
+    seed: int,
+    layout_name: str,
+    layout: EntityCollection,
+    grid_size: tuple[int, int],
+    steps: int,
+    patience: int,
+    tolerance: float,
+    epsilon: float = 0,
+    epsilon_decay: float = 1,
+) -> dict:
+    """Train a Mouse headless on the layout and return its metrics.
+
+    The Mouse explores with an epsilon-greedy Policy seeded from seed if
+    epsilon is non-zero. Training stops early once no Q-value has changed by
+    more than tolerance for patience episodes in a row.
+    """
+
+    start_time = time.perf_counter()
+    trainer = HeadlessTrain(
+        settings | {
+            'grid_size': grid_size,
+            'learning_rate': learning_rate,
+            'discount_factor': discount_factor,
+            'checkpoint_path': None,
+            'policy': EpsilonGreedyPolicy(epsilon, epsilon_decay, seed=seed)
+            if epsilon else None,
+        },
+        *layout,
+    )
+    result = trainer.run(steps, monitor=ConvergenceMonitor(tolerance, patience))
+
+    return {
+        'learning_rate': learning_rate,
+        'discount_factor': discount_factor,
+        'seed': seed,
+        'layout': layout_name,
+        'steps': result.steps,
+        'episodes': result.episodes,
+        'steps_to_convergence': result.steps if result.converged else None,
+        'final_episode_length': trainer.mouse.last_episode_length,
+        'wall_time': time.perf_counter() - start_time,
+    }
+
+
+def sweep(
+    learning_rates: list[float],
+    discount_factors: list[float],
+    seeds: list[int],
+    layouts: dict[str, EntityCollection],
+    grid_size: tuple[int, int],
+    steps: int,
+    patience: int,
+    tolerance: float,
+    epsilon: float = 0,
+    epsilon_decay: float = 1,
+    workers: int | None = None,
+) -> list[dict]:
+    """Train a Mouse for every combination of learning rate, discount factor,
+    seed and layout across a pool of worker processes (one per core by
+    default) and return the metrics of every run."""
+
+    runs = [
+        (
+            learning_rate, discount_factor, seed, name, layout, grid_size,
+            steps, patience, tolerance, epsilon, epsilon_decay,
+        )
+        for learning_rate, discount_factor, seed, (name, layout)
+        in itertools.product(
+            learning_rates, discount_factors, seeds, layouts.items(),
+        )
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(train, *zip(*runs)))
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(
+        description="Train headless Mice over a grid of hyperparameters.",
+    )
+    parser.add_argument(
+        '--learning-rates', type=float, nargs='+',
+        default=[settings['learning_rate']],
+    )
+    parser.add_argument(
+        '--discount-factors', type=float, nargs='+',
+        default=[settings['discount_factor']],
+    )
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    parser.add_argument(
+        '--layouts', type=int, default=1,
+        help="number of random layouts to train on",
+    )
+    parser.add_argument('--cat-density', type=float, default=0.1)
+    parser.add_argument(
+        '--grid-size', type=int, nargs=2, default=settings['grid_size'],
+    )
+    parser.add_argument(
+        '--steps', type=int, default=1_000_000,
+        help="maximum number of steps per run",
+    )
+    parser.add_argument(
+        '--patience', type=int, default=10,
+        help="episodes of settled Q-values needed to count as converged",
+    )
+    parser.add_argument(
+        '--tolerance', type=float, default=1e-6,
+        help="largest change in a Q-value that counts as settled",
+    )
+    parser.add_argument(
+        '--epsilon', type=float, default=0,
+        help="chance of exploring with a random Action at each step",
+    )
+    parser.add_argument(
+        '--epsilon-decay', type=float, default=1,
+        help="factor epsilon is multiplied by after each episode",
+    )
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count(),
+        help="number of processes (default one per core)",
+    )
+    parser.add_argument(
+        '--output', default=None,
+        help="CSV file to write the results to (default stdout)",
+    )
+    args = parser.parse_args()
+
+    grid_size = tuple(args.grid_size)
+    layouts = {
+        f"random-{i}": random_layout(grid_size, args.cat_density, i)
+        for i in range(args.layouts)
+    }
+    results = sweep(
+        args.learning_rates,
+        args.discount_factors,
+        args.seeds,
+        layouts,
+        grid_size,
+        args.steps,
+        args.patience,
+        args.tolerance,
+        args.epsilon,
+        args.epsilon_decay,
+        args.workers,
+    )
+
+    f = open(args.output, 'w', newline='') if args.output else sys.stdout
+    writer = csv.DictWriter(f, RESULT_FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+    if args.output:
+        f.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,28 @@
-import math
+import threading
+from typing import Callable
 
 import pygame as pg
 
 from mouse_and_cheese.base_visual import BaseVisual
-from q_learning import Action, Agent, QTable, RewardTable, State
+from mouse_and_cheese.environment import Environment
+from mouse_and_cheese.heatmap import Heatmap
+from q_learning import DenseQTable
 
 
 class Train(BaseVisual):
     """Class that trains a Mouse to get to the Cheese using simple
-    Q-learning."""
+    Q-learning.
+
+    The screen is redrawn at a fixed frame rate, with a number of learning
+    steps taken between frames (changed with the arrow keys), or with the
+    Mouse learning continuously in a background thread.
+    Pressing H toggles a heatmap of the Q-values and A toggles arrows on it
+    for the best Actions.
+    Left clicking a cell adds or removes a Cat and right clicking moves the
+    Cheese there, with the Mouse keeping what it has learned.
+    """
+
+    LEARNING_CHUNK = 1000   # Background steps between checks for stopping
 
     def __init__(
         self,
@@ -17,82 +31,36 @@ class Train(BaseVisual):
         cats: set[tuple[int, int]],
         cheese: tuple[int,int],
     ) -> None:
-        
+
         # Pygame initialisation
         super().__init__(settings)
         pg.display.set_caption("Mouse finds Cheese")
-        self.base_speed = 120
-        self.speed_multiplier = 1
-
-        # Store the set up
-        self.cats = cats
-        self.cheese = cheese
-
-        # Unpack the settings
-        learning_rate = settings['learning_rate']
-        discount_factor = settings['discount_factor']
-
-        # Create the QTable
-        states = self.states
-        states_and_actions = [
-            (state, [
-                action for action in self.actions
-                if state._identifier not in self.cats | {self.cheese} and
-                action.act_on(state) in states
-            ])
-            for state in states
-        ]
-        q_table = QTable(states_and_actions)
-
-        # Create the RewardTable
-        states_actions_rewards = []
-        for state, actions in states_and_actions:
-            actions_rewards = []
-            for action in actions:
-                if (next_identifier := action.act_on(state)._identifier) \
-                    in self.cats:
-                    reward = -10    # -10 for hitting a Cat
-                elif next_identifier == self.cheese:
-                    reward = 100    # 100 for eating the Cheese
-                else:
-                    reward = 0
-                actions_rewards.append((action, reward))
-            states_actions_rewards.append((state, actions_rewards))
-        reward_table = RewardTable(states_actions_rewards)
-        
-        # Create the Agent
-        self.mouse = Agent(
-            State((start)),
-            reward_table,
-            q_table,
-            learning_rate,
-            discount_factor,
-        )
-
-    @property
-    def states(self) -> set[State]:
-        """Return a set of all possible States.
-        
-        This is comprised of all positions contained in the grid with size
-        self.grid_size.
-        """
+        self.fps: int = settings.get('fps', 60)
+        self.steps_per_frame: float = settings.get('steps_per_frame', 2)
+        self.background_learning: bool = \
+            settings.get('background_learning', False)
 
-        return {State((x, y)) for x in range(0, self.grid_size[0])
-                  for y in range(0, self.grid_size[1])}
-    
-    @property
-    def actions(self) -> list[Action]:
-        """Return a list of all possible Actions.
-        
-        This is comprised of movements to adjacent grid positions.
-        """
+        # Create the Environment
+        self.environment = Environment(settings, start, cats, cheese)
+        self.cats = self.environment.cats
+        self.cheese = self.environment.cheese
+        self.mouse = self.environment.mouse
+        self.render_background()
+
+        # Prepare the heatmap, redrawn every heatmap_every frames when shown
+        # It needs every State's Q-values, so isn't available if lazy
+        self.layout_background = self.background
+        self.heatmap: Heatmap | None = None
+        if isinstance(self.mouse.q_table, DenseQTable):
+            self.heatmap = \
+                Heatmap(self, self.mouse.q_table, Environment.MOVES)
+        self.heatmap_every: int = settings.get('heatmap_every', 30)
+        self.show_heatmap: bool = False
+        self.show_arrows: bool = False
 
-        return [
-            Action(lambda x: (x[0], x[1] - 1)),     # Up
-            Action(lambda x: (x[0] + 1, x[1])),     # Right
-            Action(lambda x: (x[0], x[1] + 1)),     # Down
-            Action(lambda x: (x[0] - 1, x[1])),     # Left
-        ]
+        # Track the background learning
+        self._learner: threading.Thread | None = None
+        self._stop_learning = threading.Event()
 
     def check_events(self) -> None:
         """Check for new user inputs."""
@@ -100,34 +68,196 @@ class Train(BaseVisual):
         for event in pg.event.get():
 
             if event.type == pg.QUIT:
+                self.stop_learning()
+                self.environment.save_checkpoint()
+                self.environment.save_metrics()
                 pg.quit()
                 exit()
 
             elif event.type == pg.KEYDOWN:
 
                 if event.key == pg.K_RIGHT:
-                    self.speed_multiplier *= 2
+                    self.steps_per_frame *= 2
 
                 elif event.key == pg.K_LEFT:
-                    self.speed_multiplier /= 2
+                    self.steps_per_frame /= 2
+
+                elif event.key == pg.K_h and self.heatmap is not None:
+                    self.show_heatmap = not self.show_heatmap
+                    self.refresh_heatmap()
+
+                elif event.key == pg.K_a:
+                    self.show_arrows = not self.show_arrows
+                    self.refresh_heatmap()
+
+            elif event.type == pg.MOUSEBUTTONUP:
+                pos = pg.mouse.get_pos()
+                cell = (
+                    pos[0] // (self.tile_size + self.PADDING),
+                    pos[1] // (self.tile_size + self.PADDING),
+                )
+                try:
+                    if event.button == pg.BUTTON_LEFT:
+                        if cell in self.cats:
+                            self.remove_cat(cell)
+                        else:
+                            self.add_cat(cell)
+                    elif event.button == pg.BUTTON_RIGHT:
+                        self.move_cheese(cell)
+                except ValueError:
+                    pass
 
     def update_screen(self) -> None:
         """Draw the current frame to the screen."""
 
-        self.screen.fill('white')
-        super().draw_grid()
-        super().draw_cats()
-        super().draw_cheese()
-        super().draw_mouse(self.mouse.current_state._identifier)
-        pg.display.flip()
+        self.clear_frame()
+        self.draw_mouse(self.mouse.current_state._identifier)
+        self.show_frame()
+
+    def refresh_heatmap(self) -> None:
+        """Redraw the background with the current heatmap on it, or without
+        one if it isn't shown."""
+
+        if self.show_heatmap:
+            self.background = self.layout_background.copy()
+            self.heatmap.draw(self.background, self.show_arrows)
+        else:
+            self.background = self.layout_background
+        self.show_background()
+
+    def add_cat(self, cat: tuple[int, int]) -> None:
+        """Put a Cat on the grid position cat, keeping everything learned.
+
+        If cat is the start, the Cheese or off the grid then raises a
+        ValueError.
+        """
+
+        self._edit_layout(self.environment.add_cat, cat)
+
+    def remove_cat(self, cat: tuple[int, int]) -> None:
+        """Take the Cat off the grid position cat, keeping everything
+        learned.
+
+        If there is no Cat at cat then raises a ValueError.
+        """
+
+        self._edit_layout(self.environment.remove_cat, cat)
+
+    def move_cheese(self, cheese: tuple[int, int]) -> None:
+        """Move the Cheese to the grid position cheese, keeping everything
+        learned.
+
+        If cheese is the start, a Cat or off the grid then raises a
+        ValueError.
+        """
+
+        self._edit_layout(self.environment.move_cheese, cheese)
+
+    def _edit_layout(
+        self,
+        edit: Callable[[tuple[int, int]], None],
+        position: tuple[int, int],
+    ) -> None:
+        """Make the edit to the Environment at position, pausing the
+        background learning while it is made, then redraw the background."""
+
+        learning = self._learner is not None
+        self.stop_learning()
+        try:
+            edit(position)
+        finally:
+            if learning:
+                self._start_learning()
+
+        self.cheese = self.environment.cheese
+        self.render_background()
+        self.layout_background = self.background
+        self.refresh_heatmap()
+
+    def learn(self) -> None:
+        """Take learning steps until stop_learning is called.
+
+        Checkpoints the QTable and exports the Metrics periodically if their
+        paths are set.
+        """
+
+        run_steps = self.mouse.run_steps
+        checkpoint_every = self.environment.checkpoint_every
+        metrics_every = self.environment.metrics_every
+        stop_learning = self._stop_learning
+
+        # Learn in chunks short enough for the Mouse to be drawn moving
+        to_checkpoint = checkpoint_every
+        to_export = metrics_every
+        while not stop_learning.is_set():
+            chunk = min(self.LEARNING_CHUNK, to_checkpoint, to_export)
+            run_steps(chunk)
+            to_checkpoint -= chunk
+            to_export -= chunk
+            if not to_checkpoint:
+                self.environment.save_checkpoint()
+                to_checkpoint = checkpoint_every
+            if not to_export:
+                self.environment.save_metrics()
+                to_export = metrics_every
+
+    def stop_learning(self) -> None:
+        """Stop the background learning, if running, and wait for it to
+        finish its current step."""
+
+        if self._learner is not None:
+            self._stop_learning.set()
+            self._learner.join()
+            self._learner = None
+
+    def _start_learning(self) -> None:
+        """Start learning continuously in a background thread."""
+
+        self._stop_learning.clear()
+        self._learner = threading.Thread(target=self.learn, daemon=True)
+        self._learner.start()
 
     def run(self) -> None:
-        """Run the main loop."""
+        """Run the main loop.
+
+        If self.background_learning then the Mouse learns continuously in a
+        background thread and each frame shows its latest State, otherwise
+        self.steps_per_frame learning steps are taken before each frame (a
+        fraction meaning a step every few frames).
+        Checkpoints the QTable and exports the Metrics periodically if their
+        paths are set.
+        """
 
         self.update_screen()
 
+        if self.background_learning:
+            self._start_learning()
+
+        run_steps = self.mouse.run_steps
+        checkpoint_every = self.environment.checkpoint_every
+        metrics_every = self.environment.metrics_every
+        steps = 0
+        steps_owed = 0.0
+        frames = 0
         while True:
             self.check_events()
-            self.mouse.next_state()
+
+            if self._learner is None:
+                steps_owed += self.steps_per_frame
+                if steps_owed >= 1:
+                    new_steps = int(steps_owed)
+                    run_steps(new_steps)
+                    if (steps + new_steps) // checkpoint_every > \
+                        steps // checkpoint_every:
+                        self.environment.save_checkpoint()
+                    if (steps + new_steps) // metrics_every > \
+                        steps // metrics_every:
+                        self.environment.save_metrics()
+                    steps += new_steps
+                    steps_owed -= new_steps
+
+            frames += 1
+            if self.show_heatmap and frames % self.heatmap_every == 0:
+                self.refresh_heatmap()
             self.update_screen()
-            self.clock.tick(math.ceil(self.base_speed * self.speed_multiplier))
+            self.clock.tick(self.fps)
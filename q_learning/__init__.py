@@ -1,5 +1,25 @@
 from q_learning.action import Action
 from q_learning.agent import Agent
+from q_learning.batch_agent import BatchAgent
+from q_learning.convergence import ConvergenceMonitor, greedy_path
+from q_learning.dense_q_table import DenseQTable
+from q_learning.dense_reward_table import DenseRewardTable
+from q_learning.dense_transition_table import DenseTransitionTable
+from q_learning.eligibility_traces import EligibilityTraces
+from q_learning.lazy_q_table import LazyQTable
+from q_learning.lazy_reward_table import LazyRewardTable
+from q_learning.memmap_q_table import MemmapQTable
+from q_learning.metrics import Metrics
+from q_learning.policy import (
+    BoltzmannPolicy,
+    EpsilonGreedyPolicy,
+    Policy,
+    UCBPolicy,
+)
 from q_learning.q_table import QTable
+from q_learning.replay_buffer import ReplayBuffer
 from q_learning.reward_table import RewardTable
-from q_learning.state import State
+from q_learning.shared_q_table import SharedQTable
+from q_learning.state import State, StateIndex
+from q_learning.transition_table import TransitionTable
+from q_learning.value_iteration import value_iteration
@@ -1,7 +1,22 @@
+from collections import deque, namedtuple
+from typing import Iterable
+
 from q_learning.action import Action, ActionError
+from q_learning.dense_q_table import DenseQTable
+from q_learning.eligibility_traces import EligibilityTraces
+from q_learning.metrics import Metrics
+from q_learning.model import compile_model
+from q_learning.policy import Policy
 from q_learning.q_table import QTable
+from q_learning.replay_buffer import ReplayBuffer
 from q_learning.reward_table import RewardTable
 from q_learning.state import State
+from q_learning.transition_table import TransitionTable
+
+EpisodeSummary = namedtuple(
+    'EpisodeSummary', ['steps', 'total_reward', 'terminal'],
+)
+RunSummary = namedtuple('RunSummary', ['steps', 'episodes', 'total_reward'])
 
 
 class Agent:
@@ -14,7 +29,26 @@ class Agent:
         q_table: QTable,
         learning_rate: float,
         discount_factor: float,
+        transition_table: TransitionTable | None = None,
+        policy: Policy | None = None,
+        replay_buffer: ReplayBuffer | None = None,
+        replay_batch_size: int = 32,
+        metrics: Metrics | None = None,
+        trace_decay: float = 0,
+        n_steps: int = 1,
     ) -> None:
+
+        if n_steps < 1:
+            raise ValueError("n_steps must be at least 1.")
+        if trace_decay and n_steps > 1:
+            raise ValueError(
+                "Eligibility traces and n-step returns can't be used together."
+            )
+        if replay_buffer is not None and not isinstance(q_table, DenseQTable):
+            raise ValueError(
+                "Experience replay needs a DenseQTable, but the QTable is a "
+                + f"{type(q_table).__name__}."
+            )
         
         self.starting_state = starting_state
 
@@ -25,52 +59,429 @@ class Agent:
 
         self.reward_table: RewardTable = reward_table
         self.q_table: QTable = q_table
+        self.transition_table: TransitionTable | None = transition_table
+        self.policy: Policy | None = policy
 
         self.learning_rate: float = learning_rate
         self.discount_rate: float = discount_factor
 
+        # Optionally learn from past experience too (needs a DenseQTable)
+        self.replay_buffer: ReplayBuffer | None = replay_buffer
+        self.replay_batch_size: int = replay_batch_size
+
+        # Optionally pass credit back further than the previous State, with
+        # eligibility traces (Watkins's Q(lambda)) or n-step returns
+        self.trace_decay: float = trace_decay
+        self.traces: EligibilityTraces | None = \
+            EligibilityTraces() if trace_decay else None
+        self.n_steps: int = n_steps
+        self._pending: deque[tuple[State, Action, float]] = deque()
+
+        # Track the progress of learning
+        self.episode_length: int = 0
+        self.last_episode_length: int | None = None
+        self.last_max_delta: float | None = None
+        self.metrics: Metrics | None = metrics
+
+        # Arrays of next States and rewards for the fast loop, compiled on
+        # first use and kept along with the tables they were compiled from
+        self._model: tuple[tuple, list, list] | None = None
+
     def reset(self) -> None:
         """Return the Agent to the starting State."""
 
         self.current_state = self.starting_state
         self.previous_state = None
+        self.episode_length = 0
+        if self.traces is not None:
+            self.traces.clear()
+        self._pending.clear()
+        if self.metrics is not None:
+            self.metrics.resets += 1
 
-    def next_state(self) -> None:
+    def next_state(self) -> bool:
         """Choose and perform an Action using self.q_table.
+
+        The Action is chosen by self.policy if there is one, otherwise the
+        best Action is always taken. Either way the Q-value for the previous
+        State is updated towards the best Q-value at the current State (along
+        with earlier Q-values if there are eligibility traces or n-step
+        returns).
+        If there is a replay buffer, the transition is also stored in it and
+        a batch of past transitions sampled from it is learned from again.
+
+        The next State is looked up in self.transition_table if there is one,
+        otherwise the Action is called on the current State.
         
         Resets the agent if no Actions are available.
         Updates the Q-value for the previous state before advancing.
+        Returns True if the episode ended (and so the Agent was reset), in
+        which case self.last_episode_length and self.last_max_delta hold the
+        number of Actions taken in it and the largest change made to a
+        Q-value during it.
+        Records what happens in self.metrics if there is one.
         """
 
+        metrics = self.metrics
+        clock = metrics.clock if metrics is not None else None
+
         try:
 
-            action, q = self.q_table.best_action(self.current_state)
+            if clock:
+                start = clock()
+            if self.policy is not None:
+                action, q = \
+                    self.policy.choose(self.q_table, self.current_state)
+            else:
+                action, q = self.q_table.best_action(self.current_state)
+            if clock:
+                start = metrics.time('select', start)
 
             if self.previous_state:
-                self.q_table.update(
-                    self.previous_state,
-                    self.previous_action,
-                    self.previous_reward,
-                    self.learning_rate,
-                    self.discount_rate,
-                    q,
-                )
+                # Whether the Action is greedy has to be found before the
+                # update changes the Q-values at the current State
+                greedy = self.traces is None or self.policy is None or \
+                    self.q_table[self.current_state, action] == q
+                self._update(q, action, greedy)
+                if self.replay_buffer is not None:
+                    self._replay(False)
+                if metrics is not None:
+                    metrics.updates += 1
+                if clock:
+                    start = metrics.time('update', start)
 
             self.previous_state = self.current_state
             self.previous_action = action
             self.previous_reward = self.reward_table[self.current_state, action]
-            self.current_state = action.act_on(self.current_state)
+            if clock:
+                start = metrics.time('reward', start)
+            if self.transition_table is not None:
+                self.current_state = \
+                    self.transition_table[self.current_state, action]
+            else:
+                self.current_state = action.act_on(self.current_state)
+            self.episode_length += 1
+            if metrics is not None:
+                if clock:
+                    metrics.time('transition', start)
+                metrics.step(self.previous_reward)
+            return False
 
         except ActionError:
             
             if self.previous_state:
-                self.q_table.update(
-                    self.previous_state,
-                    self.previous_action,
-                    self.previous_reward,
+                self._update(0, None)
+                if self.replay_buffer is not None:
+                    self._replay(True)
+                if metrics is not None:
+                    metrics.updates += 1
+
+            if metrics is not None:
+                metrics.episode_end(self.episode_length)
+            self.last_episode_length = self.episode_length
+            self.last_max_delta = self.q_table.max_delta
+            self.q_table.max_delta = 0
+            if self.policy is not None:
+                self.policy.episode_end()
+            self.reset()
+            return True
+
+    def _update(
+        self,
+        next_best_q: float,
+        action: Action | None,
+        greedy: bool = False,
+    ) -> None:
+        """Update the Q-value for the previous State towards next_best_q, the
+        best Q-value at the current State, where action is about to be taken
+        (None if the episode is over) and greedy says whether it was the best
+        Action when chosen.
+
+        With eligibility traces every traced Q-value is updated too, and the
+        traces are cut if action isn't greedy. With n-step returns
+        the Q-value from n_steps States ago is updated instead (or all those
+        pending if the episode is over).
+        """
+
+        q_table = self.q_table
+
+        if self.traces is not None:
+            q_table.update_traces(
+                self.previous_state,
+                self.previous_action,
+                self.previous_reward,
+                self.learning_rate,
+                self.discount_rate,
+                next_best_q,
+                self.traces,
+            )
+            if action is not None and greedy:
+                self.traces.decay(self.discount_rate * self.trace_decay)
+            else:
+                self.traces.clear()
+
+        elif self.n_steps > 1:
+            pending = self._pending
+            pending.append((
+                self.previous_state,
+                self.previous_action,
+                self.previous_reward,
+            ))
+            if action is not None and len(pending) < self.n_steps:
+                return
+            while pending:
+                discounted_return = 0
+                for _, _, reward in reversed(pending):
+                    discounted_return = \
+                        reward + self.discount_rate * discounted_return
+                state, action_taken, _ = pending.popleft()
+                q_table.update(
+                    state,
+                    action_taken,
+                    discounted_return,
                     self.learning_rate,
-                    self.discount_rate,
-                    0,
+                    self.discount_rate ** (len(pending) + 1),
+                    next_best_q,
                 )
+                if action is not None:
+                    break
 
-            self.reset()
+        else:
+            q_table.update(
+                self.previous_state,
+                self.previous_action,
+                self.previous_reward,
+                self.learning_rate,
+                self.discount_rate,
+                next_best_q,
+            )
+
+    def _replay(self, terminal: bool) -> None:
+        """Store the transition from the previous State in the replay buffer
+        and update the QTable from a batch sampled from it."""
+
+        q_table = self.q_table
+        replay_buffer = self.replay_buffer
+        i, j = q_table.index((self.previous_state, self.previous_action))
+        replay_buffer.add(
+            i,
+            j,
+            self.previous_reward,
+            q_table.row_index[self.current_state],
+            terminal,
+        )
+
+        if len(replay_buffer) >= self.replay_batch_size:
+            q_table.update_batch(
+                *replay_buffer.sample(self.replay_batch_size),
+                self.learning_rate,
+                self.discount_rate,
+            )
+            if self.metrics is not None:
+                self.metrics.updates += self.replay_batch_size
+
+    def refresh_model(self, states: Iterable[State]) -> None:
+        """Bring the next States and rewards compiled for self.run_steps and
+        self.run_episode up to date after the Actions or rewards at the given
+        States have changed, without compiling them all again."""
+
+        if not self._model_is_current():
+            return
+
+        q_table = self.q_table
+        _, next_states, rewards = self._model
+        for state in states:
+            i = q_table.row_index[state]
+            for j, action in enumerate(q_table.column_labels):
+                if not q_table.mask[i, j]:
+                    next_states[i][j] = -1
+                    rewards[i][j] = 0
+                    continue
+                if self.transition_table is not None:
+                    next_state = self.transition_table[state, action]
+                else:
+                    next_state = action.act_on(state)
+                next_states[i][j] = q_table.row_index[next_state]
+                rewards[i][j] = self.reward_table[state, action]
+
+    def _model_is_current(self) -> bool:
+        """Return True if self._model was compiled from the QTable, reward
+        table and transition table the Agent has now."""
+
+        if self._model is None:
+            return False
+        tables = (self.q_table, self.reward_table, self.transition_table)
+        return all(
+            table is model_table
+            for table, model_table in zip(tables, self._model[0])
+        )
+
+    def run_steps(self, steps: int) -> RunSummary:
+        """Take the given number of steps, each the same as a call to
+        self.next_state, and return how many episodes were completed and the
+        total reward earned.
+
+        Much faster than calling self.next_state repeatedly when self.q_table
+        is a DenseQTable and there is no policy, replay buffer, timed
+        metrics, eligibility traces or n-step returns.
+        """
+
+        steps_taken, episodes, total_reward = self._run(steps, False)
+        return RunSummary(steps_taken, episodes, total_reward)
+
+    def run_episode(self, max_steps: int | None = None) -> EpisodeSummary:
+        """Take steps, each the same as a call to self.next_state, until the
+        current episode ends or max_steps steps have been taken, and return
+        the number of steps taken, the total reward earned and whether the
+        episode ended.
+
+        The step that finds the episode is over (and resets the Agent) counts
+        as a step, as it does for self.next_state.
+        """
+
+        steps_taken, episodes, total_reward = self._run(
+            max_steps if max_steps is not None else float('inf'), True,
+        )
+        return EpisodeSummary(steps_taken, total_reward, episodes > 0)
+
+    def _run(
+        self,
+        max_steps: int | float,
+        stop_at_episode_end: bool,
+    ) -> tuple[int, int, float]:
+        """Take up to max_steps steps, stopping early at the end of an
+        episode if stop_at_episode_end, and return the number of steps
+        taken, episodes completed and total reward earned."""
+
+        if self.policy is not None or self.replay_buffer is not None or \
+            self.traces is not None or self.n_steps > 1 or \
+            (self.metrics is not None and self.metrics.timing) or \
+            not isinstance(self.q_table, DenseQTable):
+            return self._run_next_state(max_steps, stop_at_episode_end)
+
+        # Work with row and column indices throughout
+        q_table = self.q_table
+        if not self._model_is_current():
+            next_states, rewards = compile_model(
+                q_table, self.reward_table, self.transition_table,
+            )
+            self._model = (
+                (q_table, self.reward_table, self.transition_table),
+                next_states.tolist(),
+                rewards.tolist(),
+            )
+        _, next_states, rewards = self._model
+
+        # Hoist everything used in the loop
+        values = q_table.values
+        has_actions = q_table._has_actions
+        start = q_table.row_index[self.starting_state]
+        learning_rate = self.learning_rate
+        keep_rate = 1 - learning_rate
+        discount_rate = self.discount_rate
+        max_delta = q_table.max_delta
+        episode_length = self.episode_length
+        metrics = self.metrics
+        episode_return = metrics.current_return if metrics is not None else 0
+
+        i = q_table.row_index[self.current_state]
+        if self.previous_state is not None:
+            previous = q_table.index(
+                (self.previous_state, self.previous_action),
+            )
+            previous_reward = self.previous_reward
+        else:
+            previous = None
+            previous_reward = 0
+
+        steps_taken = 0
+        episodes = 0
+        updates = 0
+        total_reward = 0
+        while steps_taken < max_steps:
+            steps_taken += 1
+
+            # The episode is over, so learn that nothing follows and reset
+            if not has_actions[i]:
+                if previous is not None:
+                    old_q = float(values[previous])
+                    new_q = keep_rate * old_q + learning_rate * previous_reward
+                    values[previous] = new_q
+                    if (delta := abs(new_q - old_q)) > max_delta:
+                        max_delta = delta
+                    updates += 1
+                if metrics is not None:
+                    metrics.current_return = episode_return
+                    metrics.episode_end(episode_length)
+                    metrics.resets += 1
+                episode_return = 0
+                self.last_episode_length = episode_length
+                self.last_max_delta = max_delta
+                max_delta = 0
+                episode_length = 0
+                i = start
+                previous = None
+                episodes += 1
+                if stop_at_episode_end:
+                    break
+                continue
+
+            # Take the best Action, learning from the previous one
+            row = values[i]
+            j = int(row.argmax())
+            if previous is not None:
+                old_q = float(values[previous])
+                new_q = keep_rate * old_q + learning_rate * \
+                    (previous_reward + discount_rate * float(row[j]))
+                values[previous] = new_q
+                if (delta := abs(new_q - old_q)) > max_delta:
+                    max_delta = delta
+                updates += 1
+            previous = (i, j)
+            previous_reward = rewards[i][j]
+            total_reward += previous_reward
+            episode_return += previous_reward
+            i = next_states[i][j]
+            episode_length += 1
+
+        # Leave the Agent as if it had taken the steps through next_state
+        q_table.max_delta = max_delta
+        if metrics is not None:
+            metrics.steps += steps_taken - episodes
+            metrics.updates += updates
+            metrics.current_return = episode_return
+        self.episode_length = episode_length
+        self.current_state = q_table.row_labels[i]
+        if previous is not None:
+            self.previous_state = q_table.row_labels[previous[0]]
+            self.previous_action = q_table.column_labels[previous[1]]
+            self.previous_reward = previous_reward
+        else:
+            self.previous_state = None
+
+        return steps_taken, episodes, total_reward
+
+    def _run_next_state(
+        self,
+        max_steps: int | float,
+        stop_at_episode_end: bool,
+    ) -> tuple[int, int, float]:
+        """Take up to max_steps steps through self.next_state, stopping early
+        at the end of an episode if stop_at_episode_end, and return the
+        number of steps taken, episodes completed and total reward
+        earned."""
+
+        next_state = self.next_state
+        steps_taken = 0
+        episodes = 0
+        total_reward = 0
+        while steps_taken < max_steps:
+            steps_taken += 1
+            if next_state():
+                episodes += 1
+                if stop_at_episode_end:
+                    break
+            else:
+                total_reward += self.previous_reward
+
+        return steps_taken, episodes, total_reward
@@ -0,0 +1,129 @@
+import numpy as np
+
+from q_learning.dense_q_table import DenseQTable
+from q_learning.dense_reward_table import DenseRewardTable
+from q_learning.dense_transition_table import DenseTransitionTable
+from q_learning.model import compile_model
+from q_learning.reward_table import RewardTable
+from q_learning.state import State
+from q_learning.transition_table import TransitionTable
+
+
+class BatchAgent:
+    """Batch of Agents in the environment that all take a step at the same
+    time.
+
+    Every step is carried out with array operations over the whole batch, so
+    a DenseQTable must be used. The Agents can share the single Q-table or
+    each learn their own copy of it.
+    """
+
+    def __init__(
+        self,
+        starting_state: State,
+        reward_table: RewardTable | DenseRewardTable,
+        q_table: DenseQTable,
+        learning_rate: float,
+        discount_factor: float,
+        batch_size: int,
+        shared: bool = True,
+        transition_table: TransitionTable | DenseTransitionTable | None = None,
+    ) -> None:
+
+        self.starting_state = starting_state
+        self.batch_size = batch_size
+
+        self.reward_table: RewardTable | DenseRewardTable = reward_table
+        self.q_table: DenseQTable = q_table
+        self.transition_table: TransitionTable | DenseTransitionTable | None \
+            = transition_table
+
+        self.learning_rate: float = learning_rate
+        self.discount_rate: float = discount_factor
+
+        # Compile the environment into arrays
+        self._start: int = q_table.row_index[starting_state]
+        self._terminal: np.ndarray = ~q_table.mask.any(axis=1)
+        self._next_states: np.ndarray
+        self._rewards: np.ndarray
+        self._next_states, self._rewards = \
+            compile_model(q_table, reward_table, transition_table)
+
+        # Each Agent either indexes the shared Q-values or its own copy
+        self.shared = shared
+        if shared:
+            self.q_values: np.ndarray = q_table.values
+        else:
+            self.q_values = np.repeat(
+                q_table.values[np.newaxis], batch_size, axis=0,
+            )
+        self._agents = np.arange(batch_size)
+
+        self.current_states: np.ndarray = np.full(batch_size, self._start)
+        self.previous_states: np.ndarray = np.full(batch_size, -1)
+        self.previous_actions: np.ndarray = np.zeros(batch_size, dtype=int)
+        self.previous_rewards: np.ndarray = np.zeros(batch_size)
+
+    def reset(self) -> None:
+        """Return all the Agents to the starting State."""
+
+        self.current_states[:] = self._start
+        self.previous_states[:] = -1
+
+    @property
+    def states(self) -> list[State]:
+        """Return the current State of every Agent."""
+        return [self.q_table.row_labels[i] for i in self.current_states]
+
+    def _q_rows(self, states: np.ndarray, agents: np.ndarray) -> np.ndarray:
+        """Return the rows of Q-values at the given States for the given
+        Agents."""
+
+        if self.shared:
+            return self.q_values[states]
+        return self.q_values[agents, states]
+
+    def next_state(self) -> np.ndarray:
+        """Choose and perform an Action for every Agent using the Q-values.
+
+        Resets any Agents that have no Actions available.
+        Updates the Q-value for every Agent's previous state before
+        advancing.
+        Returns a boolean array that is True for the Agents whose episode
+        ended.
+
+        When the Q-table is shared and several Agents update the same entry
+        in one step, the last of their updates is kept.
+        """
+
+        agents = self._agents
+        current = self.current_states
+        terminal = self._terminal[current]
+
+        # Choose the best Action for each Agent
+        rows = self._q_rows(current, agents)
+        actions = rows.argmax(axis=1)
+        q = np.where(terminal, 0, rows[agents, actions])
+
+        # Update the previous State-Action pairs
+        learning = self.previous_states >= 0
+        previous = self.previous_states[learning]
+        previous_actions = self.previous_actions[learning]
+        targets = self.previous_rewards[learning] + self.discount_rate * \
+            q[learning]
+        if self.shared:
+            index = (previous, previous_actions)
+        else:
+            index = (agents[learning], previous, previous_actions)
+        self.q_values[index] = (1 - self.learning_rate) * \
+            self.q_values[index] + self.learning_rate * targets
+
+        # Advance the Agents, resetting those in terminal States
+        self.previous_states = np.where(terminal, -1, current)
+        self.previous_actions = actions
+        self.previous_rewards = self._rewards[current, actions]
+        self.current_states = np.where(
+            terminal, self._start, self._next_states[current, actions],
+        )
+
+        return terminal
@@ -0,0 +1,12 @@
+from q_learning.checkpoint.checkpoint import (
+    decode_identifiers,
+    encode_identifiers,
+    load_q_table,
+    map_section,
+    read_header,
+    read_section,
+    save_q_table,
+    write_header,
+)
+from q_learning.checkpoint.checkpoint_error import CheckpointError
+from q_learning.checkpoint.sorted_identifiers import SortedIdentifiers
@@ -0,0 +1,277 @@
+"""Compact binary checkpoints of QTables.
+
+A checkpoint file is laid out as:
+    - the magic bytes b'QLCK'
+    - the length of the header as a little-endian uint32
+    - the header, as UTF-8 JSON holding the format version and the dtype,
+      shape and offset of each of the following raw NumPy arrays
+    - the State identifiers, one per row (of shape (rows,) for scalar
+      identifiers or (rows, n) for tuples of n scalars)
+    - the same identifiers in sorted order, and the row of each of them, so
+      a State's row can be found by binary search
+    - the availability mask, and whether each row has any Actions
+    - padding up to a multiple of ALIGNMENT bytes
+    - the raw Q-values, in row-major order
+
+Every array starts at a multiple of SECTION_ALIGNMENT bytes, so each can be
+memory-mapped in place.
+
+States are matched by identifier when loading and Actions by their column
+position, so a checkpoint can be loaded into a QTable built the same way in
+another process.
+"""
+
+import json
+import math
+import os
+import struct
+from typing import BinaryIO, Hashable
+
+import numpy as np
+
+from q_learning.checkpoint.checkpoint_error import CheckpointError
+from q_learning.checkpoint.sorted_identifiers import as_keys
+from q_learning.dense_q_table import DenseQTable
+from q_learning.lazy_q_table import LazyQTable
+from q_learning.q_table import QTable
+from q_learning.state import State, StateLabels
+from q_learning.table import DenseTable
+
+MAGIC = b'QLCK'
+VERSION = 3
+ALIGNMENT = 4096    # Page size, so the values can be memory-mapped
+SECTION_ALIGNMENT = 64
+
+
+def _as_dense(q_table: QTable | DenseQTable) -> DenseTable:
+    """Return q_table as a DenseTable, converting it if necessary."""
+
+    if isinstance(q_table, DenseTable):
+        return q_table
+    return DenseTable(
+        (state, row.items()) for state, row in dict.items(q_table)
+    )
+
+
+def _identifiers(dense: DenseTable) -> list[Hashable]:
+    """Return the identifiers of the States in dense's rows, in order,
+    without creating the States if they are held by a StateLabels."""
+
+    if isinstance(dense.row_labels, StateLabels):
+        return dense.row_labels.identifiers()
+    return [state._identifier for state in dense.row_labels]
+
+
+def encode_identifiers(identifiers: list[Hashable]) -> np.ndarray:
+    """Return the State identifiers as a NumPy array.
+
+    If the identifiers aren't all numbers, strings or equal-length tuples of
+    them, so can't be stored without pickling, then raises a CheckpointError.
+    """
+
+    if not identifiers:
+        return np.zeros(0, dtype=np.int64)
+    try:
+        array = np.array(identifiers)
+    except ValueError:
+        array = None
+    if (
+        array is None
+        or array.dtype.hasobject
+        or array.ndim != (2 if isinstance(identifiers[0], tuple) else 1)
+        or decode_identifiers(array) != identifiers
+    ):
+        raise CheckpointError(
+            "Only States identified by numbers, strings or equal-length "
+            + "tuples of them can be saved."
+        )
+    return array
+
+
+def decode_identifiers(array: np.ndarray) -> list[Hashable]:
+    """Return the State identifiers held in the NumPy array."""
+
+    if array.ndim == 2:
+        return list(map(tuple, array.tolist()))
+    return array.tolist()
+
+
+def write_header(
+    f: BinaryIO,
+    identifiers: np.ndarray,
+    mask: np.ndarray,
+    dtype: np.dtype,
+) -> int:
+    """Write everything up to the values to f, with identifiers holding the
+    encoded State identifiers (see encode_identifiers), and return the offset
+    the values start at."""
+
+    order = np.argsort(as_keys(identifiers), kind='stable')
+    arrays = {
+        'identifiers': identifiers,
+        'keys': identifiers[order],
+        'order': order.astype(np.int64),
+        'mask': mask,
+        'has_actions': mask.any(axis=1),
+    }
+
+    # The header's length depends on the offsets it contains, so grow the
+    # space left for it until it fits
+    header_size = 0
+    while True:
+        header = {'version': VERSION, 'sections': {}}
+        offset = len(MAGIC) + 4 + header_size
+        for name, array in arrays.items():
+            offset = -(-offset // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+            header['sections'][name] = _section(
+                array.dtype, array.shape, offset,
+            )
+            offset += array.nbytes
+        values_offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        header['sections']['values'] = _section(
+            dtype, mask.shape, values_offset,
+        )
+        encoded = json.dumps(header).encode()
+        if len(encoded) <= header_size:
+            break
+        header_size = len(encoded) + 32
+
+    f.write(MAGIC)
+    f.write(struct.pack('<I', header_size))
+    f.write(encoded.ljust(header_size))
+    for name, array in arrays.items():
+        f.seek(header['sections'][name]['offset'])
+        f.write(np.ascontiguousarray(array).tobytes())
+    f.truncate(values_offset)
+    f.seek(values_offset)
+    return values_offset
+
+
+def _section(dtype: np.dtype, shape: tuple[int, ...], offset: int) -> dict:
+    """Return the header entry for an array section of a checkpoint."""
+    return {
+        'dtype': np.dtype(dtype).str,
+        'shape': list(shape),
+        'offset': offset,
+    }
+
+
+def read_header(f: BinaryIO) -> dict:
+    """Read the header from the start of f and return it.
+
+    The header's 'sections' give the dtype, shape and offset of each array in
+    the file, which can then be read with read_section or memory-mapped with
+    map_section.
+    If f is not a checkpoint of a supported version then raises a
+    CheckpointError.
+    """
+
+    if f.read(len(MAGIC)) != MAGIC:
+        raise CheckpointError(f"{f.name} is not a QTable checkpoint.")
+    (header_size,) = struct.unpack('<I', f.read(4))
+    header = json.loads(f.read(header_size))
+    if header['version'] != VERSION:
+        raise CheckpointError(
+            f"{f.name} was saved with checkpoint version {header['version']} "
+            + f"but only version {VERSION} can be loaded."
+        )
+    return header
+
+
+def read_section(f: BinaryIO, header: dict, name: str) -> np.ndarray:
+    """Read the array section name of the checkpoint f into memory."""
+
+    section = header['sections'][name]
+    shape = tuple(section['shape'])
+    f.seek(section['offset'])
+    return np.fromfile(
+        f, dtype=np.dtype(section['dtype']), count=math.prod(shape),
+    ).reshape(shape)
+
+
+def map_section(
+    path: str,
+    header: dict,
+    name: str,
+    mode: str = 'r',
+) -> np.ndarray:
+    """Memory-map the array section name of the checkpoint at path, with the
+    given np.memmap mode."""
+
+    section = header['sections'][name]
+    shape = tuple(section['shape'])
+    if not math.prod(shape):
+        return np.zeros(shape, dtype=np.dtype(section['dtype']))
+    return np.memmap(
+        path, np.dtype(section['dtype']), mode, section['offset'], shape,
+    )
+
+
+def save_q_table(q_table: QTable | DenseQTable, path: str) -> None:
+    """Save the Q-values in q_table to a checkpoint file at path.
+
+    The file is written next to path and then moved into place, so an
+    existing checkpoint is never left half written.
+    If the States aren't identified by numbers, strings or equal-length
+    tuples of them then raises a CheckpointError.
+    """
+
+    dense = _as_dense(q_table)
+    identifiers = encode_identifiers(_identifiers(dense))
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as f:
+        write_header(f, identifiers, dense.mask, dense.values.dtype)
+        np.ascontiguousarray(dense.values).tofile(f)
+    os.replace(temporary_path, path)
+
+
+def load_q_table(path: str, q_table: QTable | DenseQTable) -> None:
+    """Load the Q-values from the checkpoint at path into q_table.
+
+    Only entries available in both the checkpoint and q_table are loaded, so
+    States that have been added or removed since saving are left alone.
+    If q_table is a LazyQTable then the rows for the States in the checkpoint
+    are created first (in the checkpoint's order, so the Actions line up).
+    If q_table has a different number of Actions to the checkpoint then
+    raises a CheckpointError.
+    """
+
+    with open(path, 'rb') as f:
+        header = read_header(f)
+        identifiers = decode_identifiers(read_section(f, header, 'identifiers'))
+        mask = read_section(f, header, 'mask')
+        values = read_section(f, header, 'values')
+
+    if isinstance(q_table, LazyQTable):
+        for identifier in identifiers:
+            q_table.visit(State(identifier))
+
+    dense = _as_dense(q_table)
+    if len(dense.column_labels) != mask.shape[1]:
+        raise CheckpointError(
+            f"The checkpoint {path} has {mask.shape[1]} Actions but the "
+            + f"QTable has {len(dense.column_labels)}."
+        )
+
+    # Match up the rows by State identifier
+    if _identifiers(dense) == identifiers:
+        rows = np.arange(len(identifiers))
+    else:
+        rows = np.array([
+            dense.row_index.get(State(identifier), -1)
+            for identifier in identifiers
+        ], dtype=int)
+    found = rows >= 0
+    rows = rows[found]
+    values = values[found]
+    loaded = mask[found] & dense.mask[rows]
+
+    if isinstance(q_table, DenseQTable):
+        q_table.values[rows] = np.where(loaded, values, q_table.values[rows])
+        return
+
+    # Set the entries one by one so the QTable's caches stay up to date
+    for i, j in zip(*np.nonzero(loaded)):
+        q_table[dense.row_labels[rows[i]], dense.column_labels[j]] = \
+            float(values[i, j])
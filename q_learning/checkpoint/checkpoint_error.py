@@ -0,0 +1,2 @@
+class CheckpointError(Exception):
+    """Custom Error for issues with saving and loading checkpoints."""
@@ -0,0 +1,66 @@
+from typing import Hashable
+
+import numpy as np
+
+from q_learning.state import StateIndex
+
+
+def as_keys(identifiers: np.ndarray) -> np.ndarray:
+    """Return the identifiers array as a 1D array that sorts and compares
+    its entries whole, viewing each row of a 2D array as one record."""
+
+    if identifiers.ndim == 1:
+        return identifiers
+    return identifiers.view(
+        [(f'f{k}', identifiers.dtype) for k in range(identifiers.shape[1])]
+    ).reshape(len(identifiers))
+
+
+class SortedIdentifiers:
+    """Lookup between rows and the State identifiers of a checkpoint, done
+    on the checkpoint's arrays so they can stay memory-mapped.
+
+    identifiers holds the identifier of each row, keys holds the same
+    identifiers in sorted order (as given by as_keys) and order holds the
+    row of each key, so a row is found by binary search without building a
+    dictionary of every State.
+    """
+
+    def __init__(
+        self,
+        identifiers: np.ndarray,
+        keys: np.ndarray,
+        order: np.ndarray,
+    ) -> None:
+
+        self.identifiers = identifiers
+        self.keys = as_keys(keys)
+        self.order = order
+
+    def identifier(self, row: int) -> Hashable:
+        """Return the identifier of the State in the given row."""
+
+        identifier = self.identifiers[row].tolist()
+        return tuple(identifier) if self.identifiers.ndim == 2 else identifier
+
+    def row(self, identifier: Hashable) -> int | None:
+        """Return the row of the State with the given identifier, or None if
+        there isn't one."""
+
+        try:
+            key = np.array(identifier, dtype=self.keys.dtype)
+        except (TypeError, ValueError):
+            return None
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+
+        # Converting to the keys' dtype can make different identifiers equal
+        # (e.g. 1 and '1'), so check the match is exact
+        row = int(self.order[i])
+        return row if self.identifier(row) == identifier else None
+
+    def state_index(self) -> StateIndex:
+        """Return a StateIndex of the States, for use as a table's
+        row_index."""
+        return StateIndex(len(self.identifiers), self.identifier, self.row)
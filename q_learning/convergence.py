@@ -0,0 +1,77 @@
+from typing import Hashable
+
+from q_learning.action import ActionError
+from q_learning.agent import Agent
+
+
+def greedy_path(agent: Agent, max_steps: int | None = None) -> list[Hashable]:
+    """Return the identifiers of the States visited by following the best
+    Actions in the Agent's QTable from its starting State, without learning.
+
+    The path stops at a State with no Actions, or after max_steps Actions
+    (default the number of States, so loops end).
+    """
+
+    q_table = agent.q_table
+    transition_table = agent.transition_table
+    if max_steps is None:
+        max_steps = len(q_table)
+
+    state = agent.starting_state
+    path = [state._identifier]
+    for _ in range(max_steps):
+        try:
+            action, _ = q_table.best_action(state)
+        except ActionError:
+            break
+        if transition_table is not None:
+            state = transition_table[state, action]
+        else:
+            state = action.act_on(state)
+        path.append(state._identifier)
+
+    return path
+
+
+class ConvergenceMonitor:
+    """Tells when an Agent has stopped learning, from the episodes it
+    completes.
+
+    By default learning has converged once no Q-value has changed by more than
+    tolerance for patience episodes in a row. If use_greedy_path then it has
+    instead converged once the greedy path from the starting State has stayed
+    the same for patience episodes in a row.
+    """
+
+    def __init__(
+        self,
+        tolerance: float = 1e-6,
+        patience: int = 10,
+        use_greedy_path: bool = False,
+    ) -> None:
+
+        self.tolerance = tolerance
+        self.patience = patience
+        self.use_greedy_path = use_greedy_path
+
+        self.episodes: int = 0
+        self.stable_episodes: int = 0
+        self.converged: bool = False
+        self._last_path: list[Hashable] | None = None
+
+    def episode_end(self, agent: Agent) -> bool:
+        """Record the episode the Agent has just completed and return True if
+        learning has converged."""
+
+        self.episodes += 1
+
+        if self.use_greedy_path:
+            path = greedy_path(agent)
+            stable = path == self._last_path
+            self._last_path = path
+        else:
+            stable = agent.last_max_delta <= self.tolerance
+
+        self.stable_episodes = self.stable_episodes + 1 if stable else 0
+        self.converged = self.stable_episodes >= self.patience
+        return self.converged
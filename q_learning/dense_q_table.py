@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Iterable
+
+import numpy as np
+
+from q_learning.action import Action, ActionError
+from q_learning.eligibility_traces import EligibilityTraces
+from q_learning.state import State, StateError
+from q_learning.table import ColumnError, DenseTable, RowError
+
+
+class DenseQTable(DenseTable):
+    """Q-table used by the Agent to choose Actions, stored as a NumPy array.
+
+    Offers the same interface as QTable, but holds the Q-values in a single
+    contiguous array with one row per State and one column per distinct
+    Action. Entries for Actions that are unavailable at a State hold -inf so
+    they are never chosen.
+    """
+
+    max_delta: float = 0    # Largest change made by update since last reset
+
+    def __init__(
+        self,
+        states_and_actions: Iterable[tuple[State, Iterable[Action]]],
+        dtype: np.dtype = np.float64,
+    ) -> None:
+
+        try:
+            super().__init__(
+                (
+                    (state, [(action, 1) for action in actions])
+                    for state, actions in states_and_actions
+                ),
+                dtype,
+            )
+        except RowError as e:
+            raise StateError(
+                f"{e} Please check your list of States for duplicates."
+            )
+
+        self.values[~self.mask] = -np.inf
+        self._has_actions: list[bool] = self.mask.any(axis=1).tolist()
+
+    @classmethod
+    def from_arrays(
+        cls,
+        states: Iterable[State],
+        actions: Iterable[Action],
+        mask: np.ndarray,
+        dtype: np.dtype = np.float64,
+        state_index: Mapping[State, int] | None = None,
+    ) -> DenseQTable:
+        """Create a QTable with one row per State and one column per Action,
+        where mask marks which Actions are available at each State.
+
+        All available entries get the initial value 1. An existing
+        state_index matching the States can be given so that several tables
+        share one.
+        If there are duplicate States then raises a StateError.
+        """
+
+        values = np.where(mask, 1, -np.inf).astype(dtype)
+        try:
+            q_table = super().from_arrays(
+                states, actions, values, mask, state_index,
+            )
+        except RowError as e:
+            raise StateError(
+                f"{e} Please check your list of States for duplicates."
+            )
+
+        q_table._has_actions = mask.any(axis=1).tolist()
+        return q_table
+
+    def _index(self, state_action: tuple[State, Action]) -> tuple[int, int]:
+        """Return the row and column indices of the given State and Action.
+
+        If the row State doesn't exist then raises a StateError.
+        If the action Action doesn't exist for the State then raises an
+        ActionError.
+        """
+
+        try:
+            return super().index(state_action)
+        except RowError:
+            raise StateError(
+                f"The State {state_action[0]} does not exist in the "
+                + "QTable, please check your initial list of States is "
+                + "comprehensive."
+            )
+        except ColumnError:
+            raise ActionError(
+                f"The State-Action pair {state_action} does not exist in "
+                + "the QTable, please check your initial list of States and "
+                + "Actions is comprehensive."
+            )
+
+    def set_actions(
+        self,
+        state: State,
+        actions: Iterable[Action],
+        initial_q: float = 1,
+    ) -> None:
+        """Change the Actions available at the row State to actions, keeping
+        the Q-values of those already available and giving the rest the
+        initial value initial_q.
+
+        If the row State doesn't exist then raises a StateError.
+        If an Action has no column in self then raises an ActionError.
+        """
+
+        try:
+            i = self.row_index[state]
+        except KeyError:
+            raise StateError(
+                f"The State {state} does not exist in the QTable, please "
+                + "check your initial list of States is comprehensive."
+            )
+
+        available = np.zeros(len(self.column_labels), dtype=bool)
+        for action in actions:
+            try:
+                available[self.column_index[action]] = True
+            except KeyError:
+                raise ActionError(
+                    f"The Action {action} does not exist in the QTable, "
+                    + "please check your initial list of Actions is "
+                    + "comprehensive."
+                )
+
+        row = self.values[i]
+        row[available & ~self.mask[i]] = initial_q
+        row[~available] = -np.inf
+        self.mask[i] = available
+        self._has_actions[i] = bool(available.any())
+
+    def best_action(self, state: State) -> tuple[Action, float]:
+        """Return the Action and its Q-value for the Action with highest Q-value
+        in the row State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the State has no Actions then raises an Action Error.
+        """
+
+        try:
+            i = self.row_index[state]
+        except KeyError:
+            raise StateError(
+                f"The State {state} does not exist in the QTable, please "
+                + "check your initial list of States is comprehensive."
+            )
+
+        if not self._has_actions[i]:
+            raise ActionError(f"The State {state} has no valid Actions.")
+
+        row = self.values[i]
+        j = int(row.argmax())
+        return self.column_labels[j], float(row[j])
+
+    def q_values(self, state: State) -> tuple[list[Action], list[float]]:
+        """Return the Actions available at the row State and their Q-values,
+        in the same order.
+
+        If the row State doesn't exist then raises a StateError.
+        If the State has no Actions then raises an Action Error.
+        """
+
+        try:
+            i = self.row_index[state]
+        except KeyError:
+            raise StateError(
+                f"The State {state} does not exist in the QTable, please "
+                + "check your initial list of States is comprehensive."
+            )
+
+        if not self._has_actions[i]:
+            raise ActionError(f"The State {state} has no valid Actions.")
+
+        columns = np.flatnonzero(self.mask[i])
+        return (
+            [self.column_labels[j] for j in columns],
+            self.values[i, columns].tolist(),
+        )
+
+    def __setitem__(
+        self,
+        state_action: tuple[State, Action],
+        q_value: float,
+    ) -> None:
+        """Set the q_value associated with the given Action at the given State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the action Action doesn't exist for the State then raises an
+        ActionError.
+        """
+
+        self.values[self._index(state_action)] = q_value
+
+    def __getitem__(self, state_action: tuple[State, Action]) -> float:
+        """Get the Q-value associated with the given Action at the given State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the action Action doesn't exist for the State then raises an
+        ActionError.
+        """
+
+        return float(self.values[self._index(state_action)])
+
+    def update(
+        self,
+        state: State,
+        action: Action,
+        reward: float,
+        learning_rate: float,
+        discount_factor: float,
+        next_best_q: float,
+    ) -> None:
+        """Update the Q-value in self at the given State, Action.
+
+        Keeps track of the largest change made in self.max_delta.
+        """
+
+        index = self._index((state, action))
+        old_q = float(self.values[index])
+        new_q = (1 - learning_rate) * old_q + \
+            learning_rate * (reward + discount_factor * next_best_q)
+        self.values[index] = new_q
+
+        if (delta := abs(new_q - old_q)) > self.max_delta:
+            self.max_delta = delta
+
+    def update_batch(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        terminals: np.ndarray,
+        learning_rate: float,
+        discount_factor: float,
+    ) -> None:
+        """Update the Q-values in self for a batch of transitions at once,
+        given as arrays of row indices of States, column indices of Actions,
+        rewards, row indices of the States reached and whether those States
+        end the episode (e.g. sampled from a ReplayBuffer).
+
+        When the batch holds the same State-Action pair more than once, the
+        last of its updates is kept.
+        Keeps track of the largest change made in self.max_delta.
+        """
+
+        next_best_q = np.where(
+            terminals, 0, self.values[next_states].max(axis=1),
+        )
+        old_q = self.values[states, actions]
+        new_q = (1 - learning_rate) * old_q + \
+            learning_rate * (rewards + discount_factor * next_best_q)
+        self.values[states, actions] = new_q
+
+        if len(new_q) and (delta := float(np.abs(new_q - old_q).max())) > \
+            self.max_delta:
+            self.max_delta = delta
+
+    def update_traces(
+        self,
+        state: State,
+        action: Action,
+        reward: float,
+        learning_rate: float,
+        discount_factor: float,
+        next_best_q: float,
+        traces: EligibilityTraces,
+    ) -> None:
+        """Update the Q-values in self for every entry with an eligibility
+        trace, by the change update would make at the given State, Action
+        scaled by each trace.
+
+        The given State, Action has its trace set to 1 first, with entries
+        keyed by their flat index so all of them are updated at once. Decaying
+        the traces afterwards is left to the caller.
+        Keeps track of the largest change made in self.max_delta.
+        """
+
+        i, j = self._index((state, action))
+        columns = self.values.shape[1]
+        traces.visit(i * columns + j)
+        step = learning_rate * (
+            reward + discount_factor * next_best_q - float(self.values[i, j])
+        )
+        rows, columns = np.divmod(np.array(traces.keys), columns)
+        self.values[rows, columns] += step * traces.traces
+
+        if (delta := abs(step)) > self.max_delta:
+            self.max_delta = delta
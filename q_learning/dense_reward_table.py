@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Iterable
+
+import numpy as np
+
+from q_learning.action import Action, ActionError
+from q_learning.state import State, StateError
+from q_learning.table import ColumnError, DenseTable, RowError
+
+
+class DenseRewardTable(DenseTable):
+    """Table of values indicating the reward the Agent receives by making a
+    given Action at a given State, stored as a NumPy array.
+
+    Offers the same interface as RewardTable.
+    """
+
+    def __init__(
+        self,
+        states_actions_rewards:
+        Iterable[tuple[State, Iterable[tuple[Action, float]]]],
+        dtype: np.dtype = np.float64,
+    ) -> None:
+
+        try:
+            super().__init__(states_actions_rewards, dtype)
+        except RowError as e:
+            raise StateError(
+                f"{e} Please check your list of States for duplicates."
+            )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        states: Iterable[State],
+        actions: Iterable[Action],
+        rewards: np.ndarray,
+        mask: np.ndarray,
+        state_index: Mapping[State, int] | None = None,
+    ) -> DenseRewardTable:
+        """Create a RewardTable with one row per State and one column per
+        Action, where mask marks which Actions are available at each State.
+
+        An existing state_index matching the States can be given so that
+        several tables share one.
+        If there are duplicate States then raises a StateError.
+        """
+
+        try:
+            return super().from_arrays(
+                states, actions, rewards, mask, state_index,
+            )
+        except RowError as e:
+            raise StateError(
+                f"{e} Please check your list of States for duplicates."
+            )
+
+    def set_rewards(
+        self,
+        state: State,
+        actions_and_rewards: Iterable[tuple[Action, float]],
+    ) -> None:
+        """Replace the Actions and rewards in the row State.
+
+        If the row State doesn't exist then raises a StateError.
+        If an Action has no column in self then raises an ActionError.
+        """
+
+        try:
+            i = self.row_index[state]
+        except KeyError:
+            raise StateError(
+                f"The State {state} does not exist in the RewardTable, "
+                + "please check your initial list of States is comprehensive."
+            )
+
+        self.mask[i] = False
+        self.values[i] = 0
+        for action, reward in actions_and_rewards:
+            try:
+                j = self.column_index[action]
+            except KeyError:
+                raise ActionError(
+                    f"The Action {action} does not exist in the RewardTable, "
+                    + "please check your initial list of Actions is "
+                    + "comprehensive."
+                )
+            self.mask[i, j] = True
+            self.values[i, j] = reward
+
+    def __setitem__(
+        self,
+        state_action: tuple[State, Action],
+        reward: float,
+    ) -> None:
+        """Set the reward for taking the given Action from the given State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the action Action doesn't exist for the State then raises an
+        ActionError.
+        """
+
+        try:
+            super().__setitem__(state_action, reward)
+        except RowError:
+            raise StateError(
+                f"The State {state_action[0]} does not exist in the "
+                + "RewardTable, please check your initial list of States is "
+                + "comprehensive."
+            )
+        except ColumnError:
+            raise ActionError(
+                f"The State-Action pair {state_action} does not exist in "
+                + "the RewardTable, please check your initial list of States "
+                + "and Actions is comprehensive."
+            )
+
+    def __getitem__(self, state_action: tuple[State, Action]) -> float:
+        """Get the reward for taking the given Action from the given State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the action Action doesn't exist for the State then raises an
+        ActionError.
+        """
+
+        try:
+            return super().__getitem__(state_action)
+        except RowError:
+            raise StateError(
+                f"The State {state_action[0]} does not exist in the "
+                + "RewardTable, please check your initial list of States is "
+                + "comprehensive."
+            )
+        except ColumnError:
+            raise ActionError(
+                f"The State-Action pair {state_action} does not exist in "
+                + "the RewardTable, please check your initial list of States "
+                + "and Actions is comprehensive."
+            )
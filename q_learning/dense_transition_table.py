@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Iterable
+
+import numpy as np
+
+from q_learning.action import Action, ActionError
+from q_learning.state import State, StateError
+from q_learning.table import ColumnError, DenseTable, RowError
+
+
+class DenseTransitionTable(DenseTable):
+    """Table of the States the Agent reaches by making a given Action at a
+    given State, stored as a NumPy array of State indices.
+
+    Offers the same interface as TransitionTable. Every State reached must
+    have its own row.
+    """
+
+    def __init__(
+        self,
+        states_actions_next_states:
+        Iterable[tuple[State, Iterable[tuple[Action, State]]]],
+    ) -> None:
+
+        states_actions_next_states = [
+            (state, list(row)) for state, row in states_actions_next_states
+        ]
+        state_index = {
+            state: i for i, (state, _) in enumerate(states_actions_next_states)
+        }
+
+        try:
+            super().__init__(
+                (
+                    (state, [
+                        (action, state_index[next_state])
+                        for action, next_state in row
+                    ])
+                    for state, row in states_actions_next_states
+                ),
+                int,
+            )
+        except RowError as e:
+            raise StateError(
+                f"{e} Please check your list of States for duplicates."
+            )
+        except KeyError as e:
+            raise StateError(
+                f"The State {e.args[0]} is reached but does not have its own "
+                + "row in the TransitionTable."
+            )
+
+        self.values[~self.mask] = -1
+
+    @classmethod
+    def from_arrays(
+        cls,
+        states: Iterable[State],
+        actions: Iterable[Action],
+        next_states: np.ndarray,
+        mask: np.ndarray,
+        state_index: Mapping[State, int] | None = None,
+    ) -> DenseTransitionTable:
+        """Create a TransitionTable with one row per State and one column per
+        Action, where next_states holds the index of the State reached and
+        mask marks which Actions are available at each State.
+
+        An existing state_index matching the States can be given so that
+        several tables share one.
+        If there are duplicate States then raises a StateError.
+        """
+
+        try:
+            return super().from_arrays(
+                states, actions, np.where(mask, next_states, -1), mask,
+                state_index,
+            )
+        except RowError as e:
+            raise StateError(
+                f"{e} Please check your list of States for duplicates."
+            )
+
+    def to_array(
+        self,
+        state_index: Mapping[State, int],
+        action_index: dict[Action, int],
+    ) -> np.ndarray:
+        """Return an array holding the index of the State reached by taking
+        each Action from each State, for use by array based tables.
+
+        Entries for States or Actions not in self are -1.
+        If a State is reached that isn't in state_index then raises a
+        StateError.
+        """
+
+        if state_index is self.row_index and \
+            list(action_index) == self.column_labels:
+            return self.values.copy()
+
+        rows, columns, i, j = self._remap(state_index, action_index)
+        next_states = np.full((len(state_index), len(action_index)), -1)
+        next_states[rows[i], columns[j]] = rows[self.values[i, j]]
+        if (next_states[rows[i], columns[j]] < 0).any():
+            raise StateError(
+                "A State is reached that does not exist in the given States."
+            )
+        return next_states
+
+    def get_row(self, state: State) -> dict[Action, State]:
+        """Return the Actions available at the given State and the States
+        they lead to.
+
+        If the row State doesn't exist then raises a StateError.
+        """
+
+        try:
+            i = self.row_index[state]
+        except KeyError:
+            raise StateError(
+                f"The State {state} does not exist in the TransitionTable, "
+                + "please check your initial list of States is comprehensive."
+            )
+
+        return {
+            self.column_labels[j]: self.row_labels[self.values[i, j]]
+            for j in np.flatnonzero(self.mask[i])
+        }
+
+    def __setitem__(
+        self,
+        state_action: tuple[State, Action],
+        next_state: State,
+    ) -> None:
+        """Set the State reached by taking the given Action from the given
+        State.
+
+        If the row State (or next_state) doesn't exist then raises a
+        StateError.
+        If the action Action doesn't exist for the State then raises an
+        ActionError.
+        """
+
+        try:
+            super().__setitem__(state_action, self.row_index[next_state])
+        except (RowError, KeyError):
+            raise StateError(
+                f"The State {state_action[0]} or {next_state} does not exist "
+                + "in the TransitionTable, please check your initial list of "
+                + "States is comprehensive."
+            )
+        except ColumnError:
+            raise ActionError(
+                f"The State-Action pair {state_action} does not exist in "
+                + "the TransitionTable, please check your initial list of "
+                + "States and Actions is comprehensive."
+            )
+
+    def __getitem__(self, state_action: tuple[State, Action]) -> State:
+        """Get the State reached by taking the given Action from the given
+        State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the action Action doesn't exist for the State then raises an
+        ActionError.
+        """
+
+        try:
+            return self.row_labels[self.values[super().index(state_action)]]
+        except RowError:
+            raise StateError(
+                f"The State {state_action[0]} does not exist in the "
+                + "TransitionTable, please check your initial list of States "
+                + "is comprehensive."
+            )
+        except ColumnError:
+            raise ActionError(
+                f"The State-Action pair {state_action} does not exist in "
+                + "the TransitionTable, please check your initial list of "
+                + "States and Actions is comprehensive."
+            )
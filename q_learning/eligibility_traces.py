@@ -0,0 +1,65 @@
+from typing import Hashable
+
+import numpy as np
+
+
+class EligibilityTraces:
+    """Sparse eligibility traces for Watkins's Q(lambda), saying how much of
+    each update the recently visited State-Action pairs get.
+
+    Only the entries with a trace of at least threshold are held, as a list
+    of keys (in whatever form the QTable uses) and a matching array of
+    traces, so decaying them and updating the QTable only touch the active
+    entries. Visiting an entry sets its trace to 1 (replacing traces).
+    """
+
+    def __init__(self, threshold: float = 1e-3) -> None:
+
+        self.threshold = threshold
+
+        self.keys: list[Hashable] = []
+        self._positions: dict[Hashable, int] = {}
+        self._traces: np.ndarray = np.zeros(16)
+
+    @property
+    def traces(self) -> np.ndarray:
+        """Return the traces of the active entries, in the order of
+        self.keys."""
+        return self._traces[:len(self.keys)]
+
+    def visit(self, key: Hashable) -> None:
+        """Set the trace of the entry key to 1, making it active if it isn't
+        already."""
+
+        i = self._positions.get(key)
+        if i is None:
+            i = len(self.keys)
+            if i == len(self._traces):
+                self._traces = np.concatenate([self._traces, np.zeros(i)])
+            self.keys.append(key)
+            self._positions[key] = i
+        self._traces[i] = 1
+
+    def decay(self, factor: float) -> None:
+        """Multiply every trace by factor, dropping the entries whose traces
+        fall below self.threshold."""
+
+        traces = self.traces
+        traces *= factor
+        active = traces >= self.threshold
+        if active.all():
+            return
+
+        self.keys = [key for key, keep in zip(self.keys, active) if keep]
+        self._traces[:len(self.keys)] = traces[active]
+        self._positions = dict(zip(self.keys, range(len(self.keys))))
+
+    def clear(self) -> None:
+        """Drop every entry."""
+
+        self.keys = []
+        self._positions = {}
+
+    def __len__(self) -> int:
+        """Return the number of active entries."""
+        return len(self.keys)
@@ -0,0 +1,102 @@
+from typing import Callable
+
+from q_learning.action import Action
+from q_learning.q_table import QTable
+from q_learning.state import State
+
+
+class LazyQTable(QTable):
+    """Q-table used by the Agent to choose Actions, with the row for each State
+    only created the first time the State is looked up.
+
+    The Actions available at a State are found by calling actions with it, so
+    no list of States is needed up front and the memory used grows with the
+    number of States the Agent actually reaches.
+    """
+
+    def __init__(
+        self,
+        actions: Callable[[State], list[Action]],
+        initial_q: float = 1,
+    ) -> None:
+
+        super().__init__()
+        self.actions = actions
+        self.initial_q = initial_q
+
+    def visit(self, state: State) -> None:
+        """Create the row State, with the Actions available at it, if it
+        doesn't exist yet."""
+
+        if state not in self:
+            self.new_actions(state, self.actions(state), self.initial_q)
+
+    def set_actions(
+        self,
+        state: State,
+        actions: list[Action],
+        initial_q: float | None = None,
+    ) -> None:
+        """Change the Actions available at the row State to actions, keeping
+        the Q-values of those already available and giving the rest the
+        initial value initial_q (default self.initial_q).
+
+        Rows that haven't been created yet are left alone, as they will get
+        their Actions from self.actions when first looked up.
+        """
+
+        if state in self:
+            super().set_actions(
+                state,
+                actions,
+                self.initial_q if initial_q is None else initial_q,
+            )
+
+    def best_action(self, state: State) -> tuple[Action, float]:
+        """Return the Action and its Q-value for the Action with highest Q-value
+        in the row State, creating the row first if needed.
+
+        If the State has no Actions then raises an Action Error.
+        """
+
+        try:
+            return self._best[state]
+        except KeyError:
+            self.visit(state)
+            return super().best_action(state)
+
+    def q_values(self, state: State) -> tuple[list[Action], list[float]]:
+        """Return the Actions available at the row State and their Q-values,
+        in the same order, creating the row first if needed.
+
+        If the State has no Actions then raises an Action Error.
+        """
+
+        self.visit(state)
+        return super().q_values(state)
+
+    def __setitem__(
+        self,
+        state_action: tuple[State, Action],
+        q_value: float,
+    ) -> None:
+        """Set the q_value associated with the given Action at the given State,
+        creating the row first if needed.
+
+        If the action Action isn't available at the State then raises an
+        ActionError.
+        """
+
+        self.visit(state_action[0])
+        super().__setitem__(state_action, q_value)
+
+    def __getitem__(self, state_action: tuple[State, Action]) -> float:
+        """Get the Q-value associated with the given Action at the given State,
+        creating the row first if needed.
+
+        If the action Action isn't available at the State then raises an
+        ActionError.
+        """
+
+        self.visit(state_action[0])
+        return super().__getitem__(state_action)
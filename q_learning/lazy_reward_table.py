@@ -0,0 +1,61 @@
+from typing import Callable
+
+from q_learning.action import Action
+from q_learning.reward_table import RewardTable
+from q_learning.state import State
+
+
+class LazyRewardTable(RewardTable):
+    """Table of values indicating the reward the Agent receives by making a
+    given Action at a given State, with each reward only computed the first
+    time it is looked up.
+
+    Rewards are found by calling reward with the State and Action, and are
+    kept so each is only computed once.
+    """
+
+    def __init__(self, reward: Callable[[State, Action], float]) -> None:
+
+        super().__init__()
+        self.reward = reward
+
+    def set_rewards(
+        self,
+        state: State,
+        actions_and_rewards: list[tuple[Action, float]],
+    ) -> None:
+        """Replace the Actions and rewards in the row State, creating it if
+        needed."""
+
+        dict.__setitem__(self, state, dict(actions_and_rewards))
+
+    def __setitem__(
+        self,
+        state_action: tuple[State, Action],
+        reward: float,
+    ) -> None:
+        """Set the reward for taking the given Action from the given State,
+        creating the row if needed."""
+
+        state, action = state_action
+        row = dict.get(self, state)
+        if row is None:
+            row = {}
+            dict.__setitem__(self, state, row)
+        row[action] = reward
+
+    def __getitem__(self, state_action: tuple[State, Action]) -> float:
+        """Get the reward for taking the given Action from the given State,
+        computing it if it hasn't been looked up before."""
+
+        state, action = state_action
+        row = dict.get(self, state)
+        if row is None:
+            row = {}
+            dict.__setitem__(self, state, row)
+
+        try:
+            return row[action]
+        except KeyError:
+            reward = row[action] = self.reward(state, action)
+            return reward
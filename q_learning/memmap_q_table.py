@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+
+from q_learning.action import Action
+from q_learning.checkpoint.checkpoint import (
+    encode_identifiers,
+    map_section,
+    read_header,
+    write_header,
+)
+from q_learning.checkpoint.checkpoint_error import CheckpointError
+from q_learning.checkpoint.sorted_identifiers import SortedIdentifiers
+from q_learning.dense_q_table import DenseQTable
+from q_learning.state import State
+from q_learning.table import DenseTable
+
+
+class MemmapQTable(DenseQTable):
+    """Q-table used by the Agent to choose Actions, with the Q-values held in
+    a memory-mapped file.
+
+    The file is a checkpoint, so only the pages holding visited States need
+    to be in memory, and it can be reopened read-only in another process to
+    look up the greedy policy without copying it. The mask and the index of
+    the States are memory-mapped from the file too, with each State's row
+    found by binary search over the file's sorted identifiers, so opening
+    the file reads nothing but its header.
+    """
+
+    ROWS_PER_CHUNK = 1 << 16    # Rows initialised at a time on creation
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        states: Iterable[State],
+        actions: Iterable[Action],
+        mask: np.ndarray,
+        dtype: np.dtype = np.float64,
+    ) -> MemmapQTable:
+        """Create a QTable backed by a new file at path, with one row per
+        State and one column per Action, where mask marks which Actions are
+        available at each State.
+
+        All available entries get the initial value 1.
+        If the States aren't identified by numbers, strings or equal-length
+        tuples of them then raises a CheckpointError.
+        """
+
+        identifiers = encode_identifiers(
+            [state._identifier for state in states]
+        )
+        with open(path, 'wb') as f:
+            offset = write_header(f, identifiers, mask, dtype)
+            f.truncate(offset + mask.size * np.dtype(dtype).itemsize)
+
+        with open(path, 'rb') as f:
+            header = read_header(f)
+        values = map_section(path, header, 'values', 'r+')
+        for start in range(0, mask.shape[0], cls.ROWS_PER_CHUNK):
+            chunk = slice(start, start + cls.ROWS_PER_CHUNK)
+            values[chunk] = np.where(mask[chunk], 1, -np.inf)
+        if isinstance(values, np.memmap):
+            values.flush()
+
+        return cls._from_file(path, header, actions, False)
+
+    @classmethod
+    def open(
+        cls,
+        path: str,
+        actions: Iterable[Action],
+        read_only: bool = True,
+    ) -> MemmapQTable:
+        """Open the QTable (or any checkpoint) at path, with the given
+        Actions for its columns in order.
+
+        If read_only then the Q-values can be looked up but not changed.
+        If the number of Actions doesn't match the file then raises a
+        CheckpointError.
+        """
+
+        with open(path, 'rb') as f:
+            header = read_header(f)
+
+        actions = list(actions)
+        columns = header['sections']['mask']['shape'][1]
+        if len(actions) != columns:
+            raise CheckpointError(
+                f"The checkpoint {path} has {columns} Actions but "
+                + f"{len(actions)} were given."
+            )
+
+        return cls._from_file(path, header, actions, read_only)
+
+    @classmethod
+    def _from_file(
+        cls,
+        path: str,
+        header: dict,
+        actions: Iterable[Action],
+        read_only: bool,
+    ) -> MemmapQTable:
+        """Create a QTable around the memory-mapped arrays of the checkpoint
+        at path."""
+
+        mode = 'r' if read_only else 'r+'
+        identifiers = SortedIdentifiers(
+            *(
+                map_section(path, header, name)
+                for name in ('identifiers', 'keys', 'order')
+            )
+        )
+        state_index = identifiers.state_index()
+
+        q_table = cls.__new__(cls)
+        DenseTable._set_arrays(
+            q_table,
+            state_index.labels,
+            actions,
+            map_section(path, header, 'values', mode),
+            map_section(path, header, 'mask', mode),
+            state_index,
+        )
+        q_table._has_actions = map_section(path, header, 'has_actions', mode)
+        q_table.path = path
+        return q_table
+
+    def flush(self) -> None:
+        """Write any changed Q-values, and changes to the Actions available,
+        to the file."""
+
+        for array in (self.values, self.mask, self._has_actions):
+            if isinstance(array, np.memmap):
+                array.flush()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import cProfile
+import csv
+import json
+import os
+import pstats
+import signal
+import time
+from collections import Counter, deque
+from types import FrameType
+from typing import Callable
+
+PHASES = ['select', 'update', 'reward', 'transition']
+
+
+class Metrics:
+    """Record of what an Agent does while learning, for finding where time
+    goes and spotting stalled training.
+
+    Counts steps, Q-value updates, episodes and resets, and keeps the length
+    and (undiscounted) return of the most recent episodes. If timing then the
+    time spent in each phase of a step (choosing the Action, updating the
+    QTable, looking up the reward and moving to the next State) is also
+    recorded, at the cost of a few clock reads per step.
+    """
+
+    def __init__(self, timing: bool = False, history: int = 1000) -> None:
+
+        # Counters
+        self.steps: int = 0
+        self.updates: int = 0
+        self.episodes: int = 0
+        self.resets: int = 0
+
+        # Recent episodes
+        self.episode_lengths: deque[int] = deque(maxlen=history)
+        self.episode_returns: deque[float] = deque(maxlen=history)
+        self.current_return: float = 0
+
+        # Timing
+        self.timing = timing
+        self.clock: Callable[[], float] | None = \
+            time.perf_counter if timing else None
+        self.phase_seconds: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.start_time: float = time.perf_counter()
+
+        # Profiling
+        self.profiler: cProfile.Profile | None = None
+        self.samples: Counter[str] = Counter()
+
+    def time(self, phase: str, start: float) -> float:
+        """Add the time since start to phase and return the current time, to
+        start timing the next phase from."""
+
+        now = self.clock()
+        self.phase_seconds[phase] += now - start
+        return now
+
+    def step(self, reward: float) -> None:
+        """Record a step that earned reward."""
+
+        self.steps += 1
+        self.current_return += reward
+
+    def episode_end(self, length: int) -> None:
+        """Record the end of an episode with the given number of steps."""
+
+        self.episodes += 1
+        self.episode_lengths.append(length)
+        self.episode_returns.append(self.current_return)
+        self.current_return = 0
+
+    def merge(self, other: Metrics) -> None:
+        """Add the counts, recent episodes and phase times recorded in other
+        (e.g. by another process learning into the same QTable) to self."""
+
+        self.steps += other.steps
+        self.updates += other.updates
+        self.episodes += other.episodes
+        self.resets += other.resets
+        self.episode_lengths.extend(other.episode_lengths)
+        self.episode_returns.extend(other.episode_returns)
+        for phase, phase_seconds in other.phase_seconds.items():
+            self.phase_seconds[phase] += phase_seconds
+        self.samples.update(other.samples)
+
+    def start_profiling(self) -> None:
+        """Start profiling everything run in this thread with cProfile."""
+
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop_profiling(self) -> pstats.Stats:
+        """Stop profiling and return the statistics collected so far."""
+
+        self.profiler.disable()
+        return pstats.Stats(self.profiler)
+
+    def start_sampling(self, interval: float = 0.001) -> None:
+        """Start sampling which function is running every interval seconds of
+        CPU time, counting the samples in self.samples.
+
+        Costs far less than cProfile, so can be left on in long runs. Uses a
+        profiling timer signal, so only works on Unix and must be called
+        from the main thread.
+        """
+
+        def sample(signum: int, frame: FrameType | None) -> None:
+            if frame is not None:
+                code = frame.f_code
+                self.samples[
+                    f"{code.co_filename}:{code.co_firstlineno}"
+                    + f"({code.co_name})"
+                ] += 1
+
+        signal.signal(signal.SIGPROF, sample)
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+
+    def stop_sampling(self) -> None:
+        """Stop sampling."""
+
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def to_dict(self) -> dict:
+        """Return a summary of the metrics recorded so far."""
+
+        seconds = time.perf_counter() - self.start_time
+        recent_episodes = len(self.episode_lengths)
+        summary = {
+            'time': time.time(),
+            'seconds': seconds,
+            'steps': self.steps,
+            'updates': self.updates,
+            'episodes': self.episodes,
+            'resets': self.resets,
+            'steps_per_second': self.steps / seconds if seconds else 0,
+            'mean_episode_length': sum(self.episode_lengths) / recent_episodes
+            if recent_episodes else None,
+            'mean_return': sum(self.episode_returns) / recent_episodes
+            if recent_episodes else None,
+        }
+        if self.timing:
+            for phase, phase_seconds in self.phase_seconds.items():
+                summary[f'{phase}_seconds'] = phase_seconds
+        return summary
+
+    def write_json(self, path: str) -> None:
+        """Write the summary to a JSON file at path, replacing it."""
+
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def write_csv(self, path: str) -> None:
+        """Append the summary as a row of a CSV file at path, writing the
+        header first if the file is new."""
+
+        summary = self.to_dict()
+        new = not os.path.exists(path) or not os.path.getsize(path)
+        with open(path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, list(summary))
+            if new:
+                writer.writeheader()
+            writer.writerow(summary)
+
+    def write(self, path: str) -> None:
+        """Write the summary to path, as CSV if it ends in .csv and JSON
+        otherwise."""
+
+        if path.endswith('.csv'):
+            self.write_csv(path)
+        else:
+            self.write_json(path)
@@ -0,0 +1,49 @@
+import numpy as np
+
+from q_learning.dense_reward_table import DenseRewardTable
+from q_learning.dense_transition_table import DenseTransitionTable
+from q_learning.reward_table import RewardTable
+from q_learning.table import DenseTable
+from q_learning.transition_table import TransitionTable
+
+
+def compile_model(
+    layout: DenseTable,
+    reward_table: RewardTable | DenseRewardTable,
+    transition_table: TransitionTable | DenseTransitionTable | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return arrays holding the index of the next State and the reward for
+    every State-Action pair in layout (e.g. a DenseQTable).
+
+    The next States are taken from transition_table if there is one,
+    otherwise the Actions are called on the States.
+    Entries for unavailable Actions have next State -1 and reward 0.
+    """
+
+    dense_rewards = isinstance(reward_table, DenseTable)
+    dense_transitions = transition_table is not None
+
+    if dense_rewards:
+        rewards = reward_table.to_array(layout.row_index, layout.column_index)
+    else:
+        rewards = np.zeros(layout.mask.shape)
+    if dense_transitions:
+        next_states = transition_table.to_array(
+            layout.row_index, layout.column_index,
+        )
+    else:
+        next_states = np.full(layout.mask.shape, -1)
+
+    # Fill in anything that can't be converted straight to an array
+    if not (dense_rewards and dense_transitions):
+        for i, j in zip(*np.nonzero(layout.mask)):
+            state = layout.row_labels[i]
+            action = layout.column_labels[j]
+            if not dense_transitions:
+                next_states[i, j] = layout.row_index[action.act_on(state)]
+            if not dense_rewards:
+                rewards[i, j] = reward_table[state, action]
+
+    next_states[~layout.mask] = -1
+    rewards[~layout.mask] = 0
+    return next_states, rewards
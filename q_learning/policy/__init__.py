@@ -0,0 +1,4 @@
+from q_learning.policy.boltzmann import BoltzmannPolicy
+from q_learning.policy.epsilon_greedy import EpsilonGreedyPolicy
+from q_learning.policy.policy import Policy, RandomBuffer
+from q_learning.policy.ucb import UCBPolicy
@@ -0,0 +1,72 @@
+import math
+from itertools import accumulate
+
+from q_learning.action import Action
+from q_learning.dense_q_table import DenseQTable
+from q_learning.policy.policy import Policy, RandomBuffer
+from q_learning.q_table import QTable
+from q_learning.state import State
+
+
+class BoltzmannPolicy(Policy):
+    """Policy that chooses each Action with probability proportional to
+    exp(Q-value / temperature), so better Actions are chosen more often.
+
+    The temperature is multiplied by decay at the end of every episode, down
+    to min_temperature.
+    """
+
+    def __init__(
+        self,
+        temperature: float,
+        decay: float = 1,
+        min_temperature: float = 1e-3,
+        seed: int | None = None,
+    ) -> None:
+
+        self.temperature = temperature
+        self.decay = decay
+        self.min_temperature = min_temperature
+        self.seed = seed
+        self._random = RandomBuffer(seed)
+
+    def choose(
+        self,
+        q_table: QTable | DenseQTable,
+        state: State,
+    ) -> tuple[Action, float]:
+        """Return the Action to take at the given State, and the highest
+        Q-value at the State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the State has no Actions then raises an ActionError.
+        """
+
+        actions, q_values = q_table.q_values(state)
+        best_q = max(q_values)
+
+        # Subtract the best Q-value so the exponentials can't overflow
+        temperature = self.temperature
+        weights = list(accumulate(
+            math.exp((q - best_q) / temperature) for q in q_values
+        ))
+        threshold = self._random() * weights[-1]
+        for action, weight in zip(actions, weights):
+            if threshold < weight:
+                return action, best_q
+
+        return actions[-1], best_q
+
+    def reseed(self, seed: int | None) -> None:
+        """Restart the random numbers from seed (or from fresh entropy if
+        seed is None)."""
+
+        self.seed = seed
+        self._random = RandomBuffer(seed)
+
+    def episode_end(self) -> None:
+        """Decay the temperature."""
+
+        self.temperature = max(
+            self.temperature * self.decay, self.min_temperature,
+        )
@@ -0,0 +1,59 @@
+from q_learning.action import Action
+from q_learning.dense_q_table import DenseQTable
+from q_learning.policy.policy import Policy, RandomBuffer
+from q_learning.q_table import QTable
+from q_learning.state import State
+
+
+class EpsilonGreedyPolicy(Policy):
+    """Policy that chooses a random Action with probability epsilon and the
+    best Action otherwise.
+
+    Epsilon is multiplied by decay at the end of every episode, down to
+    min_epsilon.
+    """
+
+    def __init__(
+        self,
+        epsilon: float,
+        decay: float = 1,
+        min_epsilon: float = 0,
+        seed: int | None = None,
+    ) -> None:
+
+        self.epsilon = epsilon
+        self.decay = decay
+        self.min_epsilon = min_epsilon
+        self.seed = seed
+        self._random = RandomBuffer(seed)
+
+    def choose(
+        self,
+        q_table: QTable | DenseQTable,
+        state: State,
+    ) -> tuple[Action, float]:
+        """Return the Action to take at the given State, and the highest
+        Q-value at the State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the State has no Actions then raises an ActionError.
+        """
+
+        action, best_q = q_table.best_action(state)
+
+        if self._random() < self.epsilon:
+            actions, _ = q_table.q_values(state)
+            action = actions[int(self._random() * len(actions))]
+
+        return action, best_q
+
+    def reseed(self, seed: int | None) -> None:
+        """Restart the random numbers from seed (or from fresh entropy if
+        seed is None)."""
+
+        self.seed = seed
+        self._random = RandomBuffer(seed)
+
+    def episode_end(self) -> None:
+        """Decay epsilon."""
+        self.epsilon = max(self.epsilon * self.decay, self.min_epsilon)
@@ -0,0 +1,56 @@
+import numpy as np
+
+from q_learning.action import Action
+from q_learning.dense_q_table import DenseQTable
+from q_learning.q_table import QTable
+from q_learning.state import State
+
+
+class RandomBuffer:
+    """Source of uniform random numbers in [0, 1), generated in batches so
+    drawing one costs little more than a list index."""
+
+    def __init__(self, seed: int | None = None, size: int = 4096) -> None:
+        self._rng = np.random.default_rng(seed)
+        self._size = size
+        self._buffer: list[float] = []
+        self._position = 0
+
+    def __call__(self) -> float:
+        """Return the next random number."""
+
+        if self._position == len(self._buffer):
+            self._buffer = self._rng.random(self._size).tolist()
+            self._position = 0
+        self._position += 1
+        return self._buffer[self._position - 1]
+
+
+class Policy:
+    """Way of choosing the Agent's Action at each State.
+
+    The default Policy is greedy: it always chooses the Action with the
+    highest Q-value.
+    """
+
+    seed: int | None = None
+
+    def choose(
+        self,
+        q_table: QTable | DenseQTable,
+        state: State,
+    ) -> tuple[Action, float]:
+        """Return the Action to take at the given State, and the highest
+        Q-value at the State (used to update the previous Q-value).
+
+        If the row State doesn't exist then raises a StateError.
+        If the State has no Actions then raises an ActionError.
+        """
+
+        return q_table.best_action(state)
+
+    def reseed(self, seed: int | None) -> None:
+        """Restart the Policy's random numbers from seed, if it uses any."""
+
+    def episode_end(self) -> None:
+        """Called by the Agent whenever an episode ends."""
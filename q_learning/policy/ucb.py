@@ -0,0 +1,57 @@
+import math
+
+from q_learning.action import Action
+from q_learning.dense_q_table import DenseQTable
+from q_learning.policy.policy import Policy
+from q_learning.q_table import QTable
+from q_learning.state import State
+
+
+class UCBPolicy(Policy):
+    """Policy that chooses the Action with the highest upper confidence bound
+    Q-value + c * sqrt(ln(N) / n), where N is the number of visits to the
+    State and n the number of times the Action has been taken from it.
+
+    Actions that have never been taken are always tried first.
+    """
+
+    def __init__(self, c: float = 1) -> None:
+
+        self.c = c
+        self._state_counts: dict[State, int] = {}
+        self._action_counts: dict[tuple[State, Action], int] = {}
+
+    def choose(
+        self,
+        q_table: QTable | DenseQTable,
+        state: State,
+    ) -> tuple[Action, float]:
+        """Return the Action to take at the given State, and the highest
+        Q-value at the State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the State has no Actions then raises an ActionError.
+        """
+
+        _, best_q = q_table.best_action(state)
+        actions, q_values = q_table.q_values(state)
+
+        state_count = self._state_counts.get(state, 0) + 1
+        self._state_counts[state] = state_count
+        log_count = math.log(state_count)
+        action_counts = self._action_counts
+
+        best_action = None
+        best_bound = -math.inf
+        for action, q in zip(actions, q_values):
+            count = action_counts.get((state, action), 0)
+            if not count:
+                best_action = action
+                break
+            bound = q + self.c * math.sqrt(log_count / count)
+            if bound > best_bound:
+                best_action, best_bound = action, bound
+
+        action_counts[state, best_action] = \
+            action_counts.get((state, best_action), 0) + 1
+        return best_action, best_q
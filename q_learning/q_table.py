@@ -1,4 +1,7 @@
+from typing import Iterable
+
 from q_learning.action import Action, ActionError
+from q_learning.eligibility_traces import EligibilityTraces
 from q_learning.state import State, StateError
 from q_learning.table import ColumnError, RowError, Table
 
@@ -8,27 +11,38 @@ class QTable(Table):
     
     Develops over time to improve its entries to enable the Agent to choose
     better Actions.
+
+    The best Action in each row is cached and kept up to date as entries are
+    set, so rows should only be changed through self.
     """
 
+    max_delta: float = 0    # Largest change made by update since last reset
+
     def __init__(
         self,
-        states_and_actions: list[tuple[State, list[Action]]] | None = None,
+        states_and_actions: Iterable[tuple[State, list[Action]]] | None = None,
     ) -> None:
 
         super().__init__()
+        self._best: dict[State, tuple[Action, float]] = {}
 
-        if states_and_actions:
+        if states_and_actions is not None:
             for state, actions in states_and_actions:
                 self.new_actions(state, actions)
 
-    def new_actions(self, state: State, actions: list[Action]) -> None:
+    def new_actions(
+        self,
+        state: State,
+        actions: list[Action],
+        initial_q: float = 1,
+    ) -> None:
         """Create an entry in self for the row State with the given Actions and
-        the initial values 1.
+        the initial values initial_q.
         
         If the row State already exists then raises a StateError.
         """
 
-        actions_and_initials = [(action, 1) for action in actions]
+        actions_and_initials = [(action, initial_q) for action in actions]
 
         try:
             super().new_row(state, actions_and_initials)
@@ -38,6 +52,44 @@ class QTable(Table):
                 + "check your list of States for duplicates."
             )
 
+        if actions_and_initials:
+            self._best[state] = actions_and_initials[0]
+
+    def set_actions(
+        self,
+        state: State,
+        actions: list[Action],
+        initial_q: float = 1,
+    ) -> None:
+        """Change the Actions available at the row State to actions, keeping
+        the Q-values of those already available and giving the rest the
+        initial value initial_q.
+
+        If the row State doesn't exist then raises a StateError.
+        """
+
+        try:
+            row = super().get_row(state)
+        except RowError:
+            raise StateError(
+                f"The State {state} does not exist in the QTable, please "
+                + "check your initial list of States is comprehensive."
+            )
+
+        new_row = {action: row.get(action, initial_q) for action in actions}
+        dict.__setitem__(self, state, new_row)
+        if actions:
+            self._rescan(state)
+        else:
+            self._best.pop(state, None)
+
+    def _rescan(self, state: State) -> None:
+        """Find the best Action in the row State and cache it."""
+
+        actions = super().get_row(state)
+        best_action = max(actions, key=actions.get)
+        self._best[state] = best_action, actions[best_action]
+
     def best_action(self, state: State) -> tuple[Action, float]:
         """Return the Action and its Q-value for the Action with highest Q-value
         in the row State.
@@ -47,24 +99,46 @@ class QTable(Table):
         """
 
         try:
-            actions = super().get_row(state)
-            try:
-                best_action = max(actions, key=actions.get)
-                return best_action, actions[best_action]
-            except ValueError:
+            return self._best[state]
+        except KeyError:
+            if state in self:
                 raise ActionError(f"The State {state} has no valid Actions.")
-        except RowError:
             raise StateError(
                 f"The State {state} does not exist in the QTable, please "
                 + "check your initial list of States is comprehensive."
             )
         
+    def q_values(self, state: State) -> tuple[list[Action], list[float]]:
+        """Return the Actions available at the row State and their Q-values,
+        in the same order.
+
+        If the row State doesn't exist then raises a StateError.
+        If the State has no Actions then raises an Action Error.
+        """
+
+        try:
+            row = super().get_row(state)
+        except RowError:
+            raise StateError(
+                f"The State {state} does not exist in the QTable, please "
+                + "check your initial list of States is comprehensive."
+            )
+
+        if not row:
+            raise ActionError(f"The State {state} has no valid Actions.")
+
+        return list(row), list(row.values())
+
     def __setitem__(
         self,
         state_action: tuple[State, Action],
         q_value: float,
     ) -> None:
         """Set the q_value associateed with the given Action at the given State.
+
+        Keeps the cached best Action of the row up to date, only searching the
+        whole row again if the best Action's value goes down or there is a
+        tie.
         
         If the row State doesn't exist then raises a StateError.
         If the action Action doesn't does't exist for the State then raises an
@@ -85,6 +159,19 @@ class QTable(Table):
                 + "the QTable, please check your initial list of States and "
                 + "Actions is comprehensive."
             )
+
+        state, action = state_action
+        best_action, best_q = self._best[state]
+        if action == best_action:
+            if q_value >= best_q:
+                self._best[state] = action, q_value
+            else:
+                self._rescan(state)
+        elif q_value > best_q:
+            self._best[state] = action, q_value
+        elif q_value == best_q:
+            # Ties go to the earliest Action in the row
+            self._rescan(state)
         
     def __getitem__(self, state_action: tuple[State, Action]) -> float:
         """Get the Q-value associated with the given Action at the given State.
@@ -118,7 +205,43 @@ class QTable(Table):
         discount_factor: float,
         next_best_q: float,
     ) -> None:
-        """Update the Q-value in self at the given State, Action."""
+        """Update the Q-value in self at the given State, Action.
+
+        Keeps track of the largest change made in self.max_delta.
+        """
 
-        self[state, action] = (1 - learning_rate) * self[state, action] + \
+        old_q = self[state, action]
+        new_q = (1 - learning_rate) * old_q + \
             learning_rate * (reward +  discount_factor * next_best_q)
+        self[state, action] = new_q
+
+        if (delta := abs(new_q - old_q)) > self.max_delta:
+            self.max_delta = delta
+
+    def update_traces(
+        self,
+        state: State,
+        action: Action,
+        reward: float,
+        learning_rate: float,
+        discount_factor: float,
+        next_best_q: float,
+        traces: EligibilityTraces,
+    ) -> None:
+        """Update the Q-values in self for every entry with an eligibility
+        trace, by the change update would make at the given State, Action
+        scaled by each trace.
+
+        The given State, Action has its trace set to 1 first. Decaying the
+        traces afterwards is left to the caller.
+        Keeps track of the largest change made in self.max_delta.
+        """
+
+        traces.visit((state, action))
+        step = learning_rate * \
+            (reward + discount_factor * next_best_q - self[state, action])
+        for state_action, trace in zip(traces.keys, traces.traces.tolist()):
+            self[state_action] += step * trace
+
+        if (delta := abs(step)) > self.max_delta:
+            self.max_delta = delta
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    """Fixed-capacity store of the Agent's past experience, for learning from
+    it again.
+
+    Each transition is held as the row index of the State, the column index of
+    the Action taken, the reward, the row index of the State reached and
+    whether that State ends the episode, in preallocated arrays. Once full,
+    the oldest transitions are overwritten.
+    """
+
+    def __init__(self, capacity: int, seed: int | None = None) -> None:
+
+        self.capacity = capacity
+        self._rng = np.random.default_rng(seed)
+
+        # Preallocate the transitions
+        self.states: np.ndarray = np.zeros(capacity, dtype=np.intp)
+        self.actions: np.ndarray = np.zeros(capacity, dtype=np.intp)
+        self.rewards: np.ndarray = np.zeros(capacity)
+        self.next_states: np.ndarray = np.zeros(capacity, dtype=np.intp)
+        self.terminals: np.ndarray = np.zeros(capacity, dtype=bool)
+
+        self._position: int = 0
+        self._size: int = 0
+
+    def add(
+        self,
+        state: int,
+        action: int,
+        reward: float,
+        next_state: int,
+        terminal: bool,
+    ) -> None:
+        """Store one transition."""
+
+        i = self._position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.terminals[i] = terminal
+
+        self._position = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def add_batch(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        terminals: np.ndarray,
+    ) -> None:
+        """Store a batch of transitions, given as arrays of equal length."""
+
+        n = len(states)
+        if n > self.capacity:
+            # Only the newest transitions would survive
+            states, actions, rewards, next_states, terminals = (
+                array[-self.capacity:]
+                for array in (states, actions, rewards, next_states, terminals)
+            )
+            n = self.capacity
+
+        index = (self._position + np.arange(n)) % self.capacity
+        self.states[index] = states
+        self.actions[index] = actions
+        self.rewards[index] = rewards
+        self.next_states[index] = next_states
+        self.terminals[index] = terminals
+
+        self._position = (self._position + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def sample(self, batch_size: int) -> tuple[np.ndarray, ...]:
+        """Return batch_size transitions chosen uniformly at random (with
+        replacement), as arrays of States, Actions, rewards, next States and
+        terminal flags.
+
+        If the buffer is empty then raises a ValueError.
+        """
+
+        if not self._size:
+            raise ValueError("Cannot sample from an empty ReplayBuffer.")
+
+        index = self._rng.integers(self._size, size=batch_size)
+        return (
+            self.states[index],
+            self.actions[index],
+            self.rewards[index],
+            self.next_states[index],
+            self.terminals[index],
+        )
+
+    def __len__(self) -> int:
+        """Return the number of transitions stored."""
+        return self._size
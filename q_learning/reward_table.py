@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from q_learning.action import Action, ActionError
 from q_learning.state import State, StateError
 from q_learning.table import ColumnError, RowError, Table
@@ -9,13 +11,13 @@ class RewardTable(Table):
 
     def __init__(
         self,
-        states_actions_rewards: list[tuple[State, list[tuple[Action, float]]]]
-        | None = None,
+        states_actions_rewards:
+        Iterable[tuple[State, list[tuple[Action, float]]]] | None = None,
     ) -> None:
         
         super().__init__()
 
-        if states_actions_rewards:
+        if states_actions_rewards is not None:
             for state, actions_and_rewards in states_actions_rewards:
                 self.new_rewards(state, actions_and_rewards)
 
@@ -38,6 +40,24 @@ class RewardTable(Table):
                 + "check your list of States for duplicates."
             )
 
+    def set_rewards(
+        self,
+        state: State,
+        actions_and_rewards: list[tuple[Action, float]],
+    ) -> None:
+        """Replace the Actions and rewards in the row State.
+
+        If the row State doesn't exist then raises a StateError.
+        """
+
+        if state not in self:
+            raise StateError(
+                f"The State {state} does not exist in the RewardTable, "
+                + "please check your initial list of States is comprehensive."
+            )
+
+        dict.__setitem__(self, state, dict(actions_and_rewards))
+
     def __setitem__(
         self,
         state_action: tuple[State, Action],
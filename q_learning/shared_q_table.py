@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from q_learning.dense_q_table import DenseQTable
+from q_learning.table import DenseTable
+
+
+class SharedQTable(DenseQTable):
+    """Q-table used by the Agent to choose Actions, with the Q-values held in
+    shared memory so that Agents in several processes can learn into it at
+    once.
+
+    Updates are made without any locking (Hogwild style): Agents may
+    occasionally overwrite each other's updates to the same entry, which
+    Q-learning tolerates in exchange for scaling across cores.
+    """
+
+    @classmethod
+    def from_q_table(cls, q_table: DenseQTable) -> SharedQTable:
+        """Create a QTable in new shared memory, with the same States, Actions
+        and Q-values as q_table.
+
+        The owner should call unlink once every process is finished with it.
+        """
+
+        shared_memory = SharedMemory(
+            create=True, size=max(q_table.values.nbytes, 1),
+        )
+        shared_q_table = cls._from_shared_memory(shared_memory, q_table)
+        shared_q_table.values[:] = q_table.values
+        return shared_q_table
+
+    @classmethod
+    def attach(cls, name: str, q_table: DenseQTable) -> SharedQTable:
+        """Attach to the existing shared QTable with the given name, whose
+        States, Actions and availability must match q_table (e.g. one built
+        the same way in this process)."""
+
+        return cls._from_shared_memory(SharedMemory(name=name), q_table)
+
+    @classmethod
+    def _from_shared_memory(
+        cls,
+        shared_memory: SharedMemory,
+        q_table: DenseQTable,
+    ) -> SharedQTable:
+        """Create a QTable with the labels of q_table around the values in
+        shared_memory."""
+
+        values = np.ndarray(
+            q_table.values.shape, q_table.values.dtype, shared_memory.buf,
+        )
+        shared_q_table = cls.__new__(cls)
+        DenseTable._set_arrays(
+            shared_q_table,
+            q_table.row_labels,
+            q_table.column_labels,
+            values,
+            q_table.mask,
+            q_table.row_index,
+        )
+        shared_q_table._has_actions = q_table._has_actions
+        shared_q_table.shared_memory = shared_memory
+        return shared_q_table
+
+    @property
+    def name(self) -> str:
+        """Return the name other processes use to attach to this QTable."""
+        return self.shared_memory.name
+
+    def close(self) -> None:
+        """Stop using the shared memory in this process."""
+
+        del self.values
+        self.shared_memory.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory once every process has closed it."""
+        self.shared_memory.unlink()
@@ -1,2 +1,3 @@
 from q_learning.state.state import State
 from q_learning.state.state_error import StateError
+from q_learning.state.state_index import StateIndex, StateLabels
@@ -1,32 +1,59 @@
 from __future__ import annotations
 
 from typing import Hashable
+from weakref import WeakValueDictionary
 
 from q_learning.state.state_error import StateError
 
 
 class State:
-    """Unique State in the Agent's environment."""
+    """Unique State in the Agent's environment.
 
-    def __init__(self, identifier: Hashable) -> None:
-        self._identifier: Hashable = identifier
+    States are interned: creating a State with the same identifier as one
+    that already exists returns the existing State rather than a new one.
+    The pool only holds weak references, so a State is freed once nothing
+    else holds it.
+    """
+
+    __slots__ = ('_identifier', '_hash', '__weakref__')
+
+    _pool: WeakValueDictionary[Hashable, State] = WeakValueDictionary()
+
+    def __new__(cls, identifier: Hashable) -> State:
 
-        # Test that this State is valid
         try:
-            self.__hash__()
+            self = cls._pool.get(identifier)
         except TypeError:
             raise StateError(
                 f"Unable to instatiate State with identifier {identifier} as "
                 + "it is not hashable."
             )
 
+        if self is None:
+            self = super().__new__(cls)
+            self._identifier: Hashable = identifier
+            self._hash: int = hash(identifier)
+            cls._pool[identifier] = self
+
+        return self
+
     def __hash__(self) -> int:
         """Return the hash of this States identifier."""
-        return hash(self._identifier)
-    
+        return self._hash
+
     def __eq__(self, other: State) -> bool:
-        """Return True if both States have the same __hash__."""
-        return self.__hash__() == other.__hash__()
+        """Return True if both States have the same identifier."""
+
+        if self is other:
+            return True
+        if not isinstance(other, State):
+            return NotImplemented
+        return self._hash == other._hash and \
+            self._identifier == other._identifier
+
+    def __reduce__(self) -> tuple[type[State], tuple[Hashable]]:
+        """Return the State's identifier so unpickling interns the State."""
+        return State, (self._identifier,)
 
     def __repr__(self) -> str:
         """Return representation of this State."""
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Callable, Hashable, Iterator
+
+from q_learning.state.state import State
+
+
+class StateIndex(Mapping[State, int]):
+    """Index of a fixed number of States, mapping each State to its row and
+    back, computed from the States' identifiers instead of stored.
+
+    Holds no States itself, so it costs nothing to build however many States
+    there are, and States are only created when a row is looked up (through
+    self.labels). Can be given to the dense tables' from_arrays as the
+    state_index, with self.labels as the States.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        identifier: Callable[[int], Hashable],
+        row: Callable[[Hashable], int | None],
+    ) -> None:
+
+        self.size = size
+        self.identifier = identifier
+        self.row = row
+        self.labels = StateLabels(self)
+
+    def __getitem__(self, state: State) -> int:
+        """Return the row of state.
+
+        If state isn't in self then raises a KeyError.
+        """
+
+        i = self.row(state._identifier) if isinstance(state, State) else None
+        if i is None:
+            raise KeyError(state)
+        return i
+
+    def __iter__(self) -> Iterator[State]:
+        """Yield every State, in row order."""
+        return iter(self.labels)
+
+    def __len__(self) -> int:
+        """Return the number of States."""
+        return self.size
+
+
+class StateLabels(Sequence[State]):
+    """The States of a StateIndex in row order, each created when it is
+    looked up."""
+
+    def __init__(self, index: StateIndex) -> None:
+        self.index = index
+
+    def identifiers(self) -> list[Hashable]:
+        """Return the identifier of every State, in row order, without
+        creating the States."""
+
+        return list(map(self.index.identifier, range(self.index.size)))
+
+    def __getitem__(self, i: int) -> State:
+        """Return the State in row i."""
+
+        if not 0 <= i < self.index.size:
+            raise IndexError(f"Row {i} is out of range.")
+        return State(self.index.identifier(int(i)))
+
+    def __len__(self) -> int:
+        """Return the number of States."""
+        return self.index.size
@@ -1,2 +1,3 @@
+from q_learning.table.dense_table import DenseTable
 from q_learning.table.errors import ColumnError, RowError
 from q_learning.table.table import Table
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Hashable, Iterable
+
+import numpy as np
+
+from q_learning.table.errors import ColumnError, RowError
+
+
+class DenseTable:
+    """2D array of numbers with O(1) look up time.
+
+    Implemented as a contiguous NumPy array, with the row and column labels
+    mapped to integer indices once on creation. Entries that were not given a
+    value on creation are marked as missing in self.mask.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[tuple[Hashable, Iterable[tuple[Hashable, float]]]],
+        dtype: np.dtype = np.float64,
+    ) -> None:
+
+        rows = [(row_label, list(row)) for row_label, row in rows]
+
+        # Map the labels to indices
+        # New columns are placed straight after the column preceding them in
+        # their row, so that the column order agrees with the order of every
+        # row where possible (this keeps tie-breaking the same as Table)
+        row_labels: list[Hashable] = []
+        row_index: dict[Hashable, int] = {}
+        column_labels: list[Hashable] = []
+        seen_columns: set[Hashable] = set()
+        for row_label, row in rows:
+            if row_label in row_index:
+                raise RowError(f"Row {row_label} already exists in the Table.")
+            row_index[row_label] = len(row_labels)
+            row_labels.append(row_label)
+            position = 0
+            for column_label, _ in row:
+                if column_label in seen_columns:
+                    position = column_labels.index(column_label) + 1
+                else:
+                    column_labels.insert(position, column_label)
+                    seen_columns.add(column_label)
+                    position += 1
+        column_index = {
+            column_label: j for j, column_label in enumerate(column_labels)
+        }
+
+        # Fill the arrays
+        shape = (len(row_labels), len(column_labels))
+        values = np.zeros(shape, dtype=dtype)
+        mask = np.zeros(shape, dtype=bool)
+        for i, (_, row) in enumerate(rows):
+            for column_label, value in row:
+                j = column_index[column_label]
+                values[i, j] = value
+                mask[i, j] = True
+
+        self._set_arrays(row_labels, column_labels, values, mask, row_index)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        row_labels: Iterable[Hashable],
+        column_labels: Iterable[Hashable],
+        values: np.ndarray,
+        mask: np.ndarray | None = None,
+        row_index: Mapping[Hashable, int] | None = None,
+    ) -> DenseTable:
+        """Create a Table directly from an array of values, with one row per
+        row label and one column per column label.
+
+        mask marks which entries have values (default all of them). An
+        existing row_index matching the row_labels can be given so that
+        several Tables share one.
+        If there are duplicate row labels then raises a RowError.
+        """
+
+        table = cls.__new__(cls)
+        DenseTable._set_arrays(
+            table, row_labels, column_labels, values, mask, row_index,
+        )
+        return table
+
+    def _set_arrays(
+        self,
+        row_labels: Iterable[Hashable],
+        column_labels: Iterable[Hashable],
+        values: np.ndarray,
+        mask: np.ndarray | None = None,
+        row_index: Mapping[Hashable, int] | None = None,
+    ) -> None:
+        """Store the labels and arrays in self, indexing the labels.
+
+        row_labels is kept as it is if it is already a sequence (e.g. a
+        StateLabels, which creates its labels as they are looked up).
+        """
+
+        if not isinstance(row_labels, Sequence):
+            row_labels = list(row_labels)
+        self.row_labels: Sequence[Hashable] = row_labels
+        if row_index is None:
+            row_index = dict(zip(self.row_labels, range(len(self.row_labels))))
+            if len(row_index) != len(self.row_labels):
+                raise RowError("The Table has duplicate rows.")
+        self.row_index: Mapping[Hashable, int] = row_index
+        self.column_labels: list[Hashable] = list(column_labels)
+        self.column_index: dict[Hashable, int] = {
+            column_label: j for j, column_label in enumerate(self.column_labels)
+        }
+
+        self.values: np.ndarray = values
+        if mask is None:
+            mask = np.ones(values.shape, dtype=bool)
+        self.mask: np.ndarray = mask
+
+    def index(
+        self,
+        row_column_labels: tuple[Hashable, Hashable],
+    ) -> tuple[int, int]:
+        """Return the row and column indices of the given labels.
+
+        If the row doesn't exist then raises a RowError.
+        If the column doesn't exist within the row then raises a ColumnError.
+        """
+
+        row_label, column_label = row_column_labels
+
+        try:
+            i = self.row_index[row_label]
+        except KeyError:
+            raise RowError(f"Row {row_label} does not exist in the Table.")
+
+        j = self.column_index.get(column_label)
+        if j is None or not self.mask[i, j]:
+            raise ColumnError(
+                f"Column {column_label} does not have a value in the row "
+                + f"{row_label}."
+            )
+
+        return i, j
+
+    def get_row(self, row_label: Hashable) -> dict[Hashable, float]:
+        """Return a copy of the row with given row_label.
+
+        If the row doesn't exist then raises a RowError.
+        """
+
+        try:
+            i = self.row_index[row_label]
+        except KeyError:
+            raise RowError(f"Row {row_label} does not exist in the Table.")
+
+        return {
+            self.column_labels[j]: float(self.values[i, j])
+            for j in np.flatnonzero(self.mask[i])
+        }
+
+    def __setitem__(
+        self,
+        row_column_labels: tuple[Hashable, Hashable],
+        value: float,
+    ) -> None:
+        """Set the value in row row_label in position column_label.
+
+        If the row doesn't exist then raises a RowError.
+        If the column doesn't exist within the row then raises a ColumnError.
+        """
+
+        self.values[self.index(row_column_labels)] = value
+
+    def __getitem__(
+        self,
+        row_column_labels: tuple[Hashable, Hashable],
+    ) -> float:
+        """Return the value in row row_label in position column_label.
+
+        If the row doesn't exist then raises a RowError.
+        If the column doesn't exist within the row then raises a ColumnError.
+        """
+
+        return float(self.values[self.index(row_column_labels)])
+
+    def to_array(
+        self,
+        row_index: Mapping[Hashable, int],
+        column_index: dict[Hashable, int],
+        fill: float = 0,
+    ) -> np.ndarray:
+        """Return the values rearranged into the rows and columns given by
+        row_index and column_index, for use with another array based Table.
+
+        Entries without a value in self are set to fill.
+        """
+
+        if row_index is self.row_index and \
+            list(column_index) == self.column_labels:
+            return np.where(self.mask, self.values, fill)
+
+        rows, columns, i, j = self._remap(row_index, column_index)
+        array = np.full(
+            (len(row_index), len(column_index)), fill, dtype=self.values.dtype,
+        )
+        array[rows[i], columns[j]] = self.values[i, j]
+        return array
+
+    def _remap(
+        self,
+        row_index: Mapping[Hashable, int],
+        column_index: dict[Hashable, int],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return where each of self's rows and columns are in the given
+        indices (-1 if they aren't), and the indices in self of the entries
+        that have values and appear in both.
+        """
+
+        rows = np.array(
+            [row_index.get(label, -1) for label in self.row_labels], dtype=int,
+        )
+        columns = np.array(
+            [column_index.get(label, -1) for label in self.column_labels],
+            dtype=int,
+        )
+        i, j = np.nonzero(
+            self.mask & (rows >= 0)[:, np.newaxis] & (columns >= 0)
+        )
+        return rows, columns, i, j
+
+    def __contains__(self, row_label: Hashable) -> bool:
+        """Return True if the row exists in the Table."""
+        return row_label in self.row_index
+
+    def __len__(self) -> int:
+        """Return the number of rows in the Table."""
+        return len(self.row_labels)
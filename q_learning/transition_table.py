@@ -0,0 +1,132 @@
+from typing import Iterable
+
+import numpy as np
+
+from q_learning.action import Action, ActionError
+from q_learning.state import State, StateError
+from q_learning.table import ColumnError, RowError, Table
+
+
+class TransitionTable(Table):
+    """Table of the States the Agent reaches by making a given Action at a
+    given State.
+
+    Compiles the Actions once so the Agent doesn't have to call them while
+    moving.
+    """
+
+    def __init__(
+        self,
+        states_actions_next_states:
+        Iterable[tuple[State, list[tuple[Action, State]]]] | None = None,
+    ) -> None:
+
+        super().__init__()
+
+        if states_actions_next_states is not None:
+            for state, actions_and_next_states in states_actions_next_states:
+                self.new_transitions(state, actions_and_next_states)
+
+    def new_transitions(
+        self,
+        state: State,
+        actions_and_next_states: list[tuple[Action, State]],
+    ) -> None:
+        """Create an entry in self for row State with the given Actions and
+        the States they lead to.
+
+        If the row State already exists then raises a StateError.
+        """
+
+        try:
+            super().new_row(state, actions_and_next_states)
+        except RowError:
+            raise StateError(
+                f"The State {state} already exists in the TransitionTable, "
+                + "please check your list of States for duplicates."
+            )
+
+    def to_array(
+        self,
+        state_index: dict[State, int],
+        action_index: dict[Action, int],
+    ) -> np.ndarray:
+        """Return an array holding the index of the State reached by taking
+        each Action from each State, for use by array based tables.
+
+        Entries for States or Actions not in self are -1.
+        If a State is reached that isn't in state_index then raises a
+        StateError.
+        """
+
+        next_states = np.full((len(state_index), len(action_index)), -1)
+
+        for state, row in dict.items(self):
+            i = state_index.get(state)
+            if i is None:
+                continue
+            for action, next_state in row.items():
+                j = action_index.get(action)
+                if j is None:
+                    continue
+                try:
+                    next_states[i, j] = state_index[next_state]
+                except KeyError:
+                    raise StateError(
+                        f"The State {next_state} reached from {state} does "
+                        + "not exist in the given States."
+                    )
+
+        return next_states
+
+    def __setitem__(
+        self,
+        state_action: tuple[State, Action],
+        next_state: State,
+    ) -> None:
+        """Set the State reached by taking the given Action from the given
+        State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the action Action doesn't does't exist for the State then raises an
+        ActionError.
+        """
+
+        try:
+            super().__setitem__(state_action, next_state)
+        except RowError:
+            raise StateError(
+                f"The State {state_action[0]} does not exist in the "
+                + "TransitionTable, please check your initial list of States "
+                + "is comprehensive."
+            )
+        except ColumnError:
+            raise ActionError(
+                f"The State-Action pair {state_action} does not exist in "
+                + "the TransitionTable, please check your initial list of "
+                + "States and Actions is comprehensive."
+            )
+
+    def __getitem__(self, state_action: tuple[State, Action]) -> State:
+        """Get the State reached by taking the given Action from the given
+        State.
+
+        If the row State doesn't exist then raises a StateError.
+        If the action Action doesn't does't exist for the State then raises an
+        ActionError.
+        """
+
+        try:
+            return super().__getitem__(state_action)
+        except RowError:
+            raise StateError(
+                f"The State {state_action[0]} does not exist in the "
+                + "TransitionTable, please check your initial list of States "
+                + "is comprehensive."
+            )
+        except ColumnError:
+            raise ActionError(
+                f"The State-Action pair {state_action} does not exist in "
+                + "the TransitionTable, please check your initial list of "
+                + "States and Actions is comprehensive."
+            )
@@ -0,0 +1,74 @@
+import numpy as np
+
+from q_learning.dense_q_table import DenseQTable
+from q_learning.dense_reward_table import DenseRewardTable
+from q_learning.dense_transition_table import DenseTransitionTable
+from q_learning.model import compile_model
+from q_learning.q_table import QTable
+from q_learning.reward_table import RewardTable
+from q_learning.table import DenseTable
+from q_learning.transition_table import TransitionTable
+
+
+def value_iteration(
+    q_table: QTable | DenseQTable,
+    reward_table: RewardTable | DenseRewardTable,
+    discount_factor: float,
+    transition_table: TransitionTable | DenseTransitionTable | None = None,
+    tolerance: float = 0,
+    max_iterations: int = 100_000,
+) -> int:
+    """Set every Q-value in q_table to its optimal value, found offline from
+    the rewards and transitions without moving an Agent.
+
+    The environment is compiled into arrays and every Q-value is updated at
+    once with Q(s, a) = R(s, a) + discount_factor * max Q(s', a') (or just
+    R(s, a) if s' has no Actions), starting from 0, until no Q-value changes
+    by more than tolerance or max_iterations sweeps have been made.
+    Returns the number of sweeps made.
+    """
+
+    if isinstance(q_table, DenseQTable):
+        layout = q_table
+    else:
+        layout = DenseTable(
+            (state, row.items()) for state, row in dict.items(q_table)
+        )
+
+    next_states, rewards = compile_model(layout, reward_table, transition_table)
+    mask = layout.mask
+    terminal = ~mask.any(axis=1)
+
+    # The Q-values are held with one row per Action, so the best value at
+    # every State is a fast elementwise maximum over the rows, and only the
+    # available entries are updated, by their flat index
+    available = np.flatnonzero(mask.T)
+    next_states = next_states.T.ravel()[available]
+    rewards = rewards.T.ravel()[available]
+
+    q_values = np.full(mask.T.shape, -np.inf)
+    flat_q_values = q_values.reshape(-1)
+    flat_q_values[available] = 0
+    available_q_values = flat_q_values[available]
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        values = q_values.max(axis=0)
+        values[terminal] = 0
+        new_available_q_values = rewards + discount_factor * values[next_states]
+        flat_q_values[available] = new_available_q_values
+
+        delta = np.abs(new_available_q_values - available_q_values)
+        available_q_values = new_available_q_values
+        if not delta.size or delta.max() <= tolerance:
+            break
+
+    if isinstance(q_table, DenseQTable):
+        q_table.values[mask] = q_values.T[mask]
+        return iterations
+
+    # Set the entries one by one so the QTable's caches stay up to date
+    for i, j in zip(*np.nonzero(mask)):
+        q_table[layout.row_labels[i], layout.column_labels[j]] = \
+            float(q_values[j, i])
+    return iterations